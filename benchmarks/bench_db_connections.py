@@ -0,0 +1,86 @@
+"""Per-request connection setup cost: a fresh connection per request, persistent connections and the psycopg pool.
+
+Runs against the configured `default` database, so point SQL_* at the Postgres you want to measure
+(TLS and auth are part of the cost). The pool mode is skipped on other backends.
+
+Usage::
+    python -m benchmarks.bench_db_connections --requests 500 --output data/bench/db_connections.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+from pathlib import Path
+
+import django
+
+from core.settings import common
+
+MODES = {
+    'fresh': {'CONN_MAX_AGE': 0},
+    'persistent': {'CONN_MAX_AGE': None},
+    'pool': {'CONN_MAX_AGE': 0, 'pool': {'min_size': 1, 'max_size': 1}},
+}
+
+
+def run(requests: int):
+    from django.conf import settings
+    from django.db.utils import ConnectionHandler
+
+    base = settings.DATABASES['default']
+    results = {}
+    for mode, overrides in MODES.items():
+        options = {key: value for key, value in base.get('OPTIONS', {}).items() if key != 'pool'}
+        if 'pool' in overrides:
+            if base['ENGINE'] != 'django.db.backends.postgresql':
+                continue
+            options['pool'] = overrides['pool']
+        # A separate handler keeps each mode's connection apart from the project's own one
+        handler = ConnectionHandler(
+            {'default': {**base, 'CONN_MAX_AGE': overrides['CONN_MAX_AGE'], 'OPTIONS': options}}
+        )
+        connection = handler['default']
+
+        timings = []
+        for _ in range(requests):
+            started = time.perf_counter()
+            connection.close_if_unusable_or_obsolete()  # request_started
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            connection.close_if_unusable_or_obsolete()  # request_finished
+            timings.append(time.perf_counter() - started)
+        connection.close()
+        if options.get('pool'):
+            connection.close_pool()
+
+        results[mode] = {
+            'requests': requests,
+            'mean_ms': round(statistics.fmean(timings) * 1000, 3),
+            'p50_ms': round(statistics.median(timings) * 1000, 3),
+        }
+    for mode, result in results.items():
+        result['saved_ms_per_request'] = round(results['fresh']['mean_ms'] - result['mean_ms'], 3)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure connection setup time saved per request')
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--output', type=Path, default=None, help='write results as JSON')
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', common.SETTINGS_MODULE)
+    django.setup()
+
+    results = run(args.requests)
+    for mode, result in results.items():
+        print(f'{mode:<12} {result["mean_ms"]:>9} ms/request  saved {result["saved_ms_per_request"]:>8} ms')
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
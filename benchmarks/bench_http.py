@@ -0,0 +1,276 @@
+"""HTTP throughput and latency of the main API endpoints.
+
+Seeds `--users` users into a benchmark database (see benchmarks/settings.py) and drives each scenario
+for `--duration` seconds from `--concurrency` threads. Requests go through Django's test client in this
+process, or over HTTP to gunicorn started with core/gunicorn_conf.py (GUNICORN_* env applies).
+
+Usage::
+    python -m benchmarks.bench_http --users 10000 --concurrency 8 --duration 10 --output data/bench/http.json
+    python -m benchmarks.bench_http --server gunicorn --workers 4 --output data/bench/http-gunicorn.json
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import statistics
+import subprocess  # nosec B404 starts gunicorn from this environment
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+PASSWORD = 'bench-password'  # nosec B105 seeded benchmark users only
+
+
+def seed(users: int):
+    from django.contrib.auth.hashers import make_password
+    from django.db import connection
+
+    from user.models import User
+
+    connection.creation.create_test_db(verbosity=0, keepdb=True, serialize=False)
+    User.objects.all().delete()
+    password = make_password(PASSWORD)  # One hash for everyone, hashing per user would dominate seeding
+    User.objects.bulk_create(
+        (
+            User(email=f'bench{index}@example.com', first_name='Bench', last_name=str(index), password=password)
+            for index in range(users)
+        ),
+        batch_size=1000,
+    )
+    return list(User.objects.values_list('id', flat=True))
+
+
+def get_scenarios(user_ids, page_sizes, tokens):
+    json_headers = {'Content-Type': 'application/json'}
+    scenarios = {
+        f'users.list.page_size={size}': lambda size=size: ('GET', f'/api/v1/users/?page_size={size}', {}, None)
+        for size in page_sizes
+    }
+    scenarios['users.retrieve'] = lambda: ('GET', f'/api/v1/users/{random.choice(user_ids)}/', {}, None)  # nosec B311
+    scenarios['users.search'] = lambda: (
+        'GET',
+        f'/api/v1/users/?search=bench{random.randrange(len(user_ids))}@',  # nosec B311
+        {},
+        None,
+    )
+    scenarios['users.filter.name'] = lambda: ('GET', f'/api/v1/users/?name={random.randrange(len(user_ids))}', {}, None)  # nosec B311
+    scenarios['users.me'] = lambda: (
+        'GET',
+        '/api/v1/users/me/',
+        {'Authorization': f'Bearer {random.choice(tokens)}'},  # nosec B311
+        None,
+    )
+    scenarios['token.obtain'] = lambda: (
+        'POST',
+        '/api/v1/token/',
+        json_headers,
+        json.dumps({'email': f'bench{random.randrange(len(user_ids))}@example.com', 'password': PASSWORD}),  # nosec B311
+    )
+    return scenarios
+
+
+class InProcessClient:
+    """Django's test client: the whole middleware and view stack, without sockets or a server."""
+
+    def __init__(self):
+        from django.test import Client
+
+        self.client = Client(raise_request_exception=False)
+
+    def request(self, method, path, headers, body):
+        if method == 'POST':
+            return self.client.post(path, body, content_type='application/json', headers=headers).status_code
+        return self.client.get(path, headers=headers).status_code
+
+    def close(self):
+        from django.db import connections
+
+        connections.close_all()
+
+
+class HttpClient:
+    """One connection per request, sync gunicorn workers don't keep connections alive."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+
+    def request(self, method, path, headers, body):
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        try:
+            connection.request(method, path, body=body, headers={**headers, 'Connection': 'close'})
+            response = connection.getresponse()
+            response.read()
+            return response.status
+        finally:
+            connection.close()
+
+    def close(self):
+        pass
+
+
+def drive(make_request, new_client, concurrency: int, duration: float, warmup: int):
+    """Run `make_request` from `concurrency` threads for `duration` seconds, return latencies and errors."""
+    latencies, errors = [], []
+    lock = threading.Lock()
+    started = deadline = None
+
+    def start_clock():
+        nonlocal started, deadline
+        started = time.perf_counter()
+        deadline = started + duration
+
+    barrier = threading.Barrier(concurrency, action=start_clock)  # Timing starts once every thread warmed up
+
+    def worker():
+        client = new_client()
+        try:
+            for _ in range(warmup):
+                client.request(*make_request())
+            barrier.wait()
+            local_latencies, local_errors = [], 0
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    status = client.request(*make_request())
+                except OSError:
+                    status = None
+                local_latencies.append(time.perf_counter() - started)
+                local_errors += status is None or status >= 400
+            with lock:
+                latencies.extend(local_latencies)
+                errors.append(local_errors)
+        finally:
+            client.close()
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, sum(errors), time.perf_counter() - started  # Includes requests still running at the deadline
+
+
+def summarize(latencies, errors, seconds):
+    percentiles = statistics.quantiles(latencies, n=100, method='inclusive') if len(latencies) > 1 else latencies * 99
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'seconds': round(seconds, 3),
+        'throughput_rps': round(len(latencies) / seconds, 1),
+        'latency_ms': {
+            'mean': round(statistics.fmean(latencies) * 1000, 2),
+            'p50': round(percentiles[49] * 1000, 2),
+            'p95': round(percentiles[94] * 1000, 2),
+            'p99': round(percentiles[98] * 1000, 2),
+            'max': round(max(latencies) * 1000, 2),
+        },
+    }
+
+
+def start_gunicorn(port: int, workers: int):
+    env = {
+        **os.environ,
+        'DJANGO_SETTINGS_MODULE': 'benchmarks.settings',
+        'GUNICORN_BIND': f'127.0.0.1:{port}',
+        'GUNICORN_WORKERS': str(workers),
+    }
+    command = [sys.executable, '-m', 'gunicorn', '-c', 'python:core.gunicorn_conf']
+    process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL)  # nosec B603
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'gunicorn exited with {process.returncode}')
+        try:
+            if HttpClient('127.0.0.1', port).request('GET', '/api/v1/live', {}, None) == 200:
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError('gunicorn did not become live within 60 seconds')
+
+
+def run(args):
+    from django.conf import settings
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from core.settings.version import __version__
+    from user.models import User
+
+    started_at = datetime.now().isoformat(timespec='seconds')
+    user_ids = seed(args.users)
+    tokens = [str(AccessToken.for_user(user)) for user in User.objects.order_by('?')[:100]]
+    scenarios = get_scenarios(user_ids, args.page_sizes, tokens)
+    if args.scenario:
+        scenarios = {name: scenario for name, scenario in scenarios.items() if name in args.scenario}
+
+    process = None
+    if args.server == 'gunicorn':
+        process = start_gunicorn(args.port, args.workers)
+
+        def new_client():
+            return HttpClient('127.0.0.1', args.port)
+    else:
+        new_client = InProcessClient
+
+    results = {}
+    try:
+        for name, make_request in scenarios.items():
+            results[name] = summarize(*drive(make_request, new_client, args.concurrency, args.duration, args.warmup))
+            result = results[name]
+            print(
+                f'{name:<28} {result["throughput_rps"]:>9} req/s  p50 {result["latency_ms"]["p50"]:>8} ms  '
+                f'p95 {result["latency_ms"]["p95"]:>8} ms  p99 {result["latency_ms"]["p99"]:>8} ms  '
+                f'errors {result["errors"]}'
+            )
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+
+    return {
+        'version': __version__,
+        'started_at': started_at,
+        'server': args.server,
+        'server_mode': settings.SERVER_MODE,
+        'workers': args.workers if args.server == 'gunicorn' else None,
+        'database': settings.DATABASES['default']['ENGINE'].rsplit('.', 1)[-1],
+        'api_cache': settings.API_CACHE_ENABLED,
+        'users': args.users,
+        'concurrency': args.concurrency,
+        'duration': args.duration,
+        'results': results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure API throughput and p50/p95/p99 latency')
+    parser.add_argument('--users', type=int, default=10000, help='users to seed')
+    parser.add_argument('--concurrency', type=int, default=8, help='client threads')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds per scenario')
+    parser.add_argument('--warmup', type=int, default=5, help='untimed requests per thread and scenario')
+    parser.add_argument('--page-sizes', type=lambda value: [int(size) for size in value.split(',')], default=[20, 100])
+    parser.add_argument('--scenario', action='append', help='run only this scenario, repeatable')
+    parser.add_argument('--server', choices=['inprocess', 'gunicorn'], default='inprocess')
+    parser.add_argument('--workers', type=int, default=4, help='gunicorn workers')
+    parser.add_argument('--port', type=int, default=8099, help='gunicorn port')
+    parser.add_argument('--output', type=Path, default=None, help='write results as JSON')
+    args = parser.parse_args()
+
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'benchmarks.settings'
+    import django
+
+    django.setup()
+
+    report = run(args)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Logging throughput benchmark.
+
+Usage::
+    python -m benchmarks.bench_logging --records 20000 --output data/bench/logging.json
+"""
+
+import argparse
+import json
+import logging
+import time
+from pathlib import Path
+
+from loguru import logger
+
+from core.utils.logger import INFO, Logg, LoguruHandler, _init_logger
+
+
+def run(records: int):
+    std_logger = logging.getLogger('celery.bench')
+    std_logger.handlers = [LoguruHandler()]
+    std_logger.propagate = False
+    std_logger.setLevel(logging.DEBUG)
+
+    cases = {
+        'logg.info': lambda: Logg.info(e='bench.event', msg='benchmark', value=1),
+        'logg.debug.disabled': lambda: Logg.debug(e='bench.event', msg='benchmark', value=1),
+        'handler.info': lambda: std_logger.info('benchmark %s', 1),
+        'handler.debug.disabled': lambda: std_logger.debug('benchmark %s', 1),
+    }
+    results = {}
+    for name, case in cases.items():
+        started = time.perf_counter()
+        for _ in range(records):
+            case()
+        elapsed = time.perf_counter() - started
+        results[name] = {
+            'records': records,
+            'seconds': round(elapsed, 4),
+            'records_per_second': round(records / elapsed),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure records per second for Logg and LoguruHandler')
+    parser.add_argument('--records', type=int, default=20000)
+    parser.add_argument('--output', type=Path, default=None, help='write results as JSON')
+    args = parser.parse_args()
+
+    # Format every record like production does, but discard the output
+    _init_logger(Path('.'), debug=False, level=INFO)
+    logger.remove()
+    logger.add(lambda message: None, level=INFO, format='{time} | {level: <8} | {message} | {name}:{function}:{line}')
+
+    results = run(args.records)
+    for name, result in results.items():
+        print(f'{name:<24} {result["records_per_second"]:>10} records/s')
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""Users list serialization: DRF's UserSerializer over model instances against the compiled ReadLayout over values().
+
+Seeds `--users` users into the benchmark database (see benchmarks/settings.py) and times fetching plus
+serializing all of them, and serializing alone from rows fetched up front. Both outputs are rendered
+to JSON and compared byte for byte before timing.
+
+Usage::
+    python -m benchmarks.bench_serializers --users 10000 --repeat 5 --output data/bench/serializers.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+from pathlib import Path
+
+
+def measure(function, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def run(users: int, repeat: int):
+    from benchmarks.bench_http import seed
+    from core.utils.renderers import JSONRenderer
+    from core.utils.serializers import ReadLayout
+    from user.models import User
+    from user.serializers import UserSerializer
+
+    seed(users)
+    layout = ReadLayout.compile(UserSerializer())
+    instances = list(User.objects.all())
+    rows = list(User.objects.values(*layout.columns))
+
+    renderer = JSONRenderer()
+    expected = renderer.render(UserSerializer(instances, many=True).data)
+    if renderer.render(layout.bind(rows, many=True).data) != expected:
+        raise AssertionError('ReadLayout output differs from UserSerializer')
+
+    cases = {
+        'serializer': lambda: UserSerializer(list(User.objects.all()), many=True).data,
+        'layout': lambda: layout.bind(list(User.objects.values(*layout.columns)), many=True).data,
+        'serializer.serialize_only': lambda: UserSerializer(instances, many=True).data,
+        'layout.serialize_only': lambda: layout.bind(rows, many=True).data,
+    }
+    results = {}
+    for name, function in cases.items():
+        function()  # Warm up
+        timings = measure(function, repeat)
+        results[name] = {
+            'rows': users,
+            'mean_ms': round(statistics.fmean(timings) * 1000, 2),
+            'best_ms': round(min(timings) * 1000, 2),
+            'rows_per_second': round(users / min(timings)),
+        }
+    for name in ('layout', 'layout.serialize_only'):
+        baseline = results[name.replace('layout', 'serializer')]['best_ms']
+        results[name]['speedup'] = round(baseline / results[name]['best_ms'], 2)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare UserSerializer and the compiled ReadLayout on a users list')
+    parser.add_argument('--users', type=int, default=10000, help='users to seed and serialize')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per case')
+    parser.add_argument('--output', type=Path, default=None, help='write results as JSON')
+    args = parser.parse_args()
+
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'benchmarks.settings'
+    import django
+
+    django.setup()
+
+    results = run(args.users, args.repeat)
+    for name, result in results.items():
+        speedup = f'  x{result["speedup"]}' if 'speedup' in result else ''
+        print(f'{name:<26} {result["best_ms"]:>9} ms  {result["rows_per_second"]:>9} rows/s{speedup}')
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,26 @@
+"""Settings for benchmarks.bench_http: the project settings on a separate database, with DEBUG off.
+
+SQLite benchmarks use data/bench.sqlite3, Postgres ones the `bench_<SQL_DATABASE>` database.
+"""
+
+import importlib
+
+from core.settings import common
+
+globals().update(
+    {name: value for name, value in vars(importlib.import_module(common.SETTINGS_MODULE)).items() if name.isupper()}
+)
+
+DEBUG = False  # DEBUG keeps every query in connection.queries
+
+_default = common.DATABASES['default']
+_name = (
+    common.BASE_DIR / 'data' / 'bench.sqlite3'
+    if _default['ENGINE'] == 'django.db.backends.sqlite3'
+    else f'bench_{_default["NAME"]}'
+)
+# Replicas would serve the project's data, not the seeded users
+DATABASES = {'default': {**_default, 'NAME': _name, 'TEST': {'NAME': _name}}}
+
+# Keep benchmark entries apart from the project's ones in a shared Redis
+CACHES = {alias: {**config, 'KEY_PREFIX': 'bench'} for alias, config in common.CACHES.items()}
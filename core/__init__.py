@@ -1,3 +1,10 @@
-from .celery.celery import app as celery_app
+def __getattr__(name):
+    # Celery loads on first use (`celery -A core`, task modules) instead of with every web process and command
+    if name == 'celery_app':
+        from .celery.celery import app
+
+        return app
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
 
 __all__ = ('celery_app',)
@@ -0,0 +1,96 @@
+import math
+import time
+
+from celery.worker import state
+from celery.worker.autoscale import Autoscaler
+from django.conf import settings
+
+from core.celery.celery_enums import CeleryTaskQueues
+from core.utils.logger import Logg
+
+
+def get_desired_concurrency(depths, active, rate, target_latency, urgent_reserve, max_concurrency):
+    """Pool size that starts every waiting task within `target_latency` seconds.
+
+    `depths` are waiting messages per consumed queue and `rate` the tasks per second one process
+    completes. Each queue needs enough processes to drain its backlog in time. When the worker
+    consumes `urgent`, at least `urgent_reserve` processes are kept for it on top of the other
+    queues, which share what is left below `max_concurrency`.
+    """
+    per_process = max(rate * target_latency, 1.0)
+    needed = {queue: math.ceil(depth / per_process) for queue, depth in depths.items()}
+    urgent = max(needed.pop(CeleryTaskQueues.URGENT, 0), urgent_reserve) if CeleryTaskQueues.URGENT in depths else 0
+    other = min(active + sum(needed.values()), max(max_concurrency - urgent, 0))
+    return other + urgent
+
+
+class QueueDepthAutoscaler(Autoscaler):
+    """Worker autoscaler (`--autoscale=MAX,MIN`) driven by broker queue depth and observed throughput.
+
+    Celery's default scales on prefetched requests only, which stay at zero with prefetch multiplier 1
+    until a process is already free. Depths are read at most once per `poll_interval` seconds.
+    """
+
+    poll_interval = 1.0
+    # Weight of the newest sample in the tasks per second per process average
+    rate_smoothing = 0.2
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.target_latency = settings.CELERY_AUTOSCALE_TARGET_LATENCY
+        self.urgent_reserve = settings.CELERY_AUTOSCALE_URGENT_RESERVE
+        self.rate = 1.0  # Until tasks complete, assume one task per second per process
+        self.depths = {}
+        self._connection = None
+        self._polled_at = None
+        self._completed = 0
+        self._desired = self.min_concurrency
+
+    @property
+    def qty(self):
+        now = time.monotonic()
+        if self._polled_at is None or now - self._polled_at >= self.poll_interval:
+            self.update_rate(now)
+            self.depths = self.get_queue_depths() or self.depths
+            self._polled_at = now
+            self._desired = get_desired_concurrency(
+                self.depths,
+                active=len(state.active_requests),
+                rate=self.rate,
+                target_latency=self.target_latency,
+                urgent_reserve=self.urgent_reserve,
+                max_concurrency=self.max_concurrency,
+            )
+        return self._desired
+
+    def update_rate(self, now):
+        completed = sum(state.total_count.values())
+        busy = len(state.active_requests) or 1
+        if self._polled_at is not None and completed > self._completed:
+            sample = (completed - self._completed) / (now - self._polled_at) / busy
+            self.rate += self.rate_smoothing * (sample - self.rate)
+        self._completed = completed
+
+    def get_queue_depths(self):
+        queues = self.worker.app.amqp.queues.consume_from or self.worker.app.amqp.queues
+        try:
+            if self._connection is None:
+                self._connection = self.worker.app.connection_for_read()
+            return {name: self.get_queue_depth(name) for name in queues}
+        except Exception as exc:
+            # Broker errors vary by transport and the autoscaler thread takes the worker down on any of them
+            Logg.warning(e='celery.autoscale', msg='queue depth unavailable', error=repr(exc))
+            self._connection = None
+            return None
+
+    def get_queue_depth(self, name):
+        # A channel per queue: AMQP closes the channel that declared a missing queue
+        channel = self._connection.channel()
+        try:
+            return channel.queue_declare(queue=name, passive=True).message_count
+        except self._connection.channel_errors as exc:
+            if 'NOT_FOUND' not in str(exc):
+                raise
+            return 0  # Redis deletes emptied lists, so an idle queue doesn't exist until the next message
+        finally:
+            channel.close()
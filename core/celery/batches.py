@@ -0,0 +1,103 @@
+import json
+import math
+
+from celery import shared_task
+from django.core.cache import cache
+
+from core import celery_app  # noqa: F401 Shared tasks sent from web processes need the configured app
+from core.utils.buffer import get_list_buffer
+from core.utils.logger import Logg
+
+
+class BatchedTask:
+    """Celery task that processes buffered items in groups instead of one message per item.
+
+    Producers call `enqueue`, which pushes JSON items to a shared buffer. A consume task is sent
+    when the buffer reaches `max_size`, or `max_wait` seconds after the first item of a group.
+    Each invocation pops up to `max_size` items and passes them to the handler as one list.
+    Without a buffer shared with workers (see `get_list_buffer`) each `enqueue` sends its items in the message.
+    When the handler raises, the group is retried item by item, and the items that still fail
+    are logged and reported in the task result. Handlers should be idempotent.
+
+    Usage::
+        @batched_task(name=CeleryTasks.USER_EXAMPLE, max_size=500, max_wait=2)
+        def send_emails(items):
+            ...
+
+        send_emails.enqueue({'user_id': 1})
+    """
+
+    def __init__(self, handler, name: str, max_size: int, max_wait: float, **task_options):
+        self.handler = handler
+        self.name = name
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self.buffer = get_list_buffer(f'batch:{name}')
+
+        def consume(items=None):
+            return self.consume(items)
+
+        consume.__module__ = handler.__module__
+        consume.__qualname__ = consume.__name__ = handler.__name__
+        self.task = shared_task(name=name, **task_options)(consume)
+
+    @property
+    def scheduled_key(self):
+        return f'batch:{self.name}:scheduled'
+
+    def enqueue(self, *items):
+        if self.buffer is None:
+            self.task.apply_async(args=[list(items)])
+            return
+        size = self.buffer.push(*[json.dumps(item) for item in items])
+        if size // self.max_size > (size - len(items)) // self.max_size:
+            self.task.apply_async()  # A full group is waiting
+        else:
+            self.schedule()
+
+    def schedule(self):
+        # One delayed consume per waiting group, the flag expires together with the countdown
+        if cache.add(self.scheduled_key, 1, timeout=max(1, math.ceil(self.max_wait))):
+            self.task.apply_async(countdown=self.max_wait)
+
+    def consume(self, items=None):
+        if items is not None or self.buffer is None:
+            items = items or []
+            failed = self.process(items) if items else []
+            return {'success': not failed, 'processed': len(items), 'failed': failed}
+
+        items = [json.loads(item) for item in self.buffer.pop(self.max_size)]
+        failed = self.process(items) if items else []
+
+        remaining = self.buffer.size()
+        if remaining >= self.max_size:
+            self.task.apply_async()
+        elif remaining:
+            cache.delete(self.scheduled_key)
+            self.schedule()
+        return {'success': not failed, 'processed': len(items), 'failed': failed}
+
+    def process(self, items):
+        try:
+            self.handler(items)
+            return []
+        except Exception as exc:
+            if len(items) == 1:
+                Logg.error(e='celery.batch', msg='item failed', task=self.name, item=items[0], error=repr(exc))
+                return [{'item': items[0], 'error': repr(exc)}]
+        failed = []
+        for item in items:
+            failed.extend(self.process([item]))
+        return failed
+
+    def __call__(self, items):
+        return self.handler(items)
+
+
+def batched_task(name: str, max_size: int = 100, max_wait: float = 5, **task_options):
+    """Register `handler(items)` as a BatchedTask, `task_options` go to `shared_task`."""
+
+    def decorator(handler):
+        return BatchedTask(handler, name, max_size, max_wait, **task_options)
+
+    return decorator
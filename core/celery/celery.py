@@ -3,11 +3,16 @@ from logging.config import dictConfig
 
 from celery import Celery, signals
 from django import conf, setup
+from django.apps import apps
 
+from core.celery.metrics import install_metrics
 from core.settings import common
+from core.utils import db  # noqa: F401 Prefork children drop inherited DB connections
+from core.utils.logger import flush_logging
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', common.SETTINGS_MODULE)
-setup()
+if not apps.ready:  # Already set up when a task module loads the app in a web process
+    setup()
 
 app = Celery(
     main='app',
@@ -18,10 +23,21 @@ app = Celery(
 app.config_from_object('core.celery.celery_config')
 app.autodiscover_tasks()
 
-if conf.settings.TESTING:
+if conf.settings.CELERY_TASK_ALWAYS_EAGER:
     app.conf.update(task_always_eager=True)
 
+if conf.settings.CELERY_METRICS_ENABLED:
+    install_metrics(
+        conf.settings.CELERY_METRICS_DIR, port=conf.settings.CELERY_METRICS_PORT, host=conf.settings.CELERY_METRICS_HOST
+    )
+
 
 @signals.setup_logging.connect
 def config_loggers(*args, **kwargs):
     dictConfig(conf.settings.LOGGING)
+
+
+@signals.worker_process_shutdown.connect
+def flush_loggers(*args, **kwargs):
+    # Prefork children exit with os._exit, atexit hooks don't run there
+    flush_logging()
@@ -8,10 +8,14 @@ worker_max_tasks_per_child = 1000
 worker_disable_rate_limits = False
 broker_transport_options = {'queue_order_strategy': 'priority'}
 beat_schedule_filename = common.BASE_DIR / 'data' / 'celerybeat-schedule'
+beat_scheduler = 'core.celery.scheduler:LeaderScheduler'
+worker_autoscaler = 'core.celery.autoscale:QueueDepthAutoscaler'  # With --autoscale only
 
 task_routes = {
     # urgent
     CeleryTasks.USER_EXAMPLE: {'queue': CeleryTaskQueues.URGENT},
+    # low
+    CeleryTasks.USER_FLUSH_LAST_LOGIN: {'queue': CeleryTaskQueues.LOW},
 }
 
 beat_schedule = {
@@ -20,6 +24,11 @@ beat_schedule = {
         'schedule': 5,
     },
 }
+if common.LAST_LOGIN_BUFFERED:  # Nothing is buffered otherwise
+    beat_schedule['flush_last_login'] = {
+        'task': CeleryTasks.USER_FLUSH_LAST_LOGIN,
+        'schedule': common.LAST_LOGIN_FLUSH_INTERVAL,
+    }
 
 task_queues = {
     CeleryTaskQueues.LOW: {
@@ -9,3 +9,4 @@ class CeleryTaskQueues(enum.StrEnum):
 
 class CeleryTasks(enum.StrEnum):
     USER_EXAMPLE = 'user.example'
+    USER_FLUSH_LAST_LOGIN = 'user.flush_last_login'
@@ -0,0 +1,264 @@
+import contextlib
+import fcntl
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from celery import signals
+
+from core.utils.logger import Logg
+
+# Runtimes and queue waits of background tasks, from milliseconds to minutes
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+HELP = {
+    'celery_tasks_total': ('counter', 'Task events by state: received, success, failure, retry.'),
+    'celery_task_runtime_seconds': ('histogram', 'Task execution time.'),
+    'celery_task_queue_wait_seconds': ('histogram', 'Time between publishing a task and its start.'),
+}
+STATES = {'SUCCESS': 'success', 'FAILURE': 'failure', 'RETRY': 'retry'}
+# Counts of exited pool processes, summed into one file instead of a `{pid}.json` left behind by each
+RETIRED_FILENAME = 'retired.json'
+LOCK_FILENAME = 'metrics.lock'
+
+
+class MetricsRegistry:
+    """Counters and histograms of one process, keyed by metric name and a tuple of label pairs."""
+
+    def __init__(self):
+        self.counters = defaultdict(float)
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, labels: tuple, value: float = 1):
+        with self._lock:
+            self.counters[name, labels] += value
+
+    def observe(self, name: str, labels: tuple, value: float):
+        with self._lock:
+            buckets, total = self.histograms.get((name, labels)) or ([0] * (len(BUCKETS) + 1), 0.0)
+            buckets[bisect_left(BUCKETS, value)] += 1
+            self.histograms[name, labels] = (buckets, total + value)
+
+    def clear(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'counters': [[name, labels, value] for (name, labels), value in self.counters.items()],
+                'histograms': [
+                    [name, labels, list(b), total] for (name, labels), (b, total) in self.histograms.items()
+                ],
+            }
+
+    def merge(self, snapshot):
+        for name, labels, value in snapshot['counters']:
+            self.inc(name, _to_labels(labels), value)
+        with self._lock:
+            for name, labels, buckets, total in snapshot['histograms']:
+                key = (name, _to_labels(labels))
+                current, current_total = self.histograms.get(key) or ([0] * (len(BUCKETS) + 1), 0.0)
+                self.histograms[key] = ([a + b for a, b in zip(current, buckets)], current_total + total)
+
+    def render(self):
+        """Prometheus text exposition format."""
+        lines = []
+        snapshot = self.snapshot()
+        for metric, (kind, help_text) in HELP.items():
+            lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} {kind}']
+            for name, labels, value in sorted(snapshot['counters']):
+                if name == metric:
+                    lines.append(f'{name}{_format_labels(labels)} {value:g}')
+            for name, labels, buckets, total in sorted(snapshot['histograms']):
+                if name != metric:
+                    continue
+                cumulative = 0
+                for bound, count in zip([*BUCKETS, '+Inf'], buckets):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{_format_labels(labels + (("le", str(bound)),))} {cumulative}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {total:g}')
+                lines.append(f'{name}_count{_format_labels(labels)} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+_started = {}
+_last_write = 0.0
+_write_lock = threading.Lock()
+_pending_write = None  # Timer writing the counts of skipped writes once the interval is over
+_directory, _port, _host = None, 0, '127.0.0.1'
+
+
+def write_snapshot(directory, force=False, interval=1.0):
+    """Save this process' metrics as `{pid}.json` in `directory`, at most once per `interval` unless forced.
+
+    A skipped write is caught up at the end of the interval, the last counts of a burst don't wait for the next task.
+    """
+    global _last_write, _pending_write
+    with _write_lock:
+        now = time.monotonic()
+        if not force and now - _last_write < interval:
+            if _pending_write is None:
+                _pending_write = threading.Timer(
+                    interval - (now - _last_write), write_snapshot, args=(directory,), kwargs={'force': True}
+                )
+                _pending_write.daemon = True
+                _pending_write.start()
+            return
+        if _pending_write is not None:
+            _pending_write.cancel()
+            _pending_write = None
+        _last_write = now
+        path = Path(directory) / f'{os.getpid()}.json'
+        tmp_path = path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(registry.snapshot()))
+        tmp_path.replace(path)
+
+
+def read_metrics(directory):
+    """Merge the snapshots of every worker process into one Prometheus text page."""
+    merged = MetricsRegistry()
+    with _locked(directory, fcntl.LOCK_SH):  # A retiring process' counts are in its file or the retired one
+        for path in Path(directory).glob('*.json'):
+            try:
+                merged.merge(json.loads(path.read_text()))
+            except (OSError, ValueError):  # Removed or half-written by a process that is restarting
+                continue
+    return merged.render()
+
+
+def retire_snapshot(directory):
+    """Fold this process' metrics into the retired snapshot of `directory` and remove its `{pid}.json`."""
+    global _pending_write
+    with _write_lock:
+        if _pending_write is not None:
+            _pending_write.cancel()
+            _pending_write = None
+        directory = Path(directory)
+        with _locked(directory, fcntl.LOCK_EX):
+            retired = MetricsRegistry()
+            path = directory / RETIRED_FILENAME
+            with contextlib.suppress(FileNotFoundError):
+                retired.merge(json.loads(path.read_text()))
+            retired.merge(registry.snapshot())
+            tmp_path = path.with_suffix('.tmp')
+            tmp_path.write_text(json.dumps(retired.snapshot()))
+            tmp_path.replace(path)
+            (directory / f'{os.getpid()}.json').unlink(missing_ok=True)
+
+
+def install_metrics(directory, port=0, host='127.0.0.1'):
+    """Collect task metrics through celery signals, serve them on `port` from the main worker process."""
+    global _directory, _port, _host
+    _directory, _port, _host = Path(directory), port, host
+    signals.before_task_publish.connect(stamp_published_at)
+    signals.worker_init.connect(reset_directory)
+    signals.worker_ready.connect(serve_metrics)
+    signals.worker_process_init.connect(reset_registry)
+    signals.task_received.connect(count_received)
+    signals.task_prerun.connect(start_timer)
+    signals.task_postrun.connect(stop_timer)
+    signals.worker_process_shutdown.connect(retire_metrics)
+    signals.worker_shutdown.connect(flush_metrics)
+
+
+def stamp_published_at(headers=None, **kwargs):
+    if headers is not None:
+        headers.setdefault('published_at', time.time())
+
+
+def reset_directory(**kwargs):
+    # Counters restart with the worker, like prometheus_client multiprocess mode
+    _directory.mkdir(parents=True, exist_ok=True)
+    for path in _directory.glob('*.json'):
+        path.unlink(missing_ok=True)
+
+
+def serve_metrics(**kwargs):
+    if _port:
+        start_metrics_server(_directory, _port, _host)
+
+
+def reset_registry(**kwargs):
+    global _pending_write
+    registry.clear()  # Forked from the main process, whose counts are reported by its own file
+    _pending_write = None  # The main process' timer thread isn't running in this one
+
+
+def count_received(request=None, **kwargs):
+    labels = (('task', request.name), ('queue', _get_queue(request.delivery_info)))
+    registry.inc('celery_tasks_total', labels + (('state', 'received'),))
+    write_snapshot(_directory)
+
+
+def start_timer(task_id=None, task=None, **kwargs):
+    _started[task_id] = time.perf_counter()
+    published_at = getattr(task.request, 'published_at', None)
+    if published_at:
+        labels = (('task', task.name), ('queue', _get_queue(task.request.delivery_info)))
+        registry.observe('celery_task_queue_wait_seconds', labels, max(0.0, time.time() - published_at))
+
+
+def stop_timer(task_id=None, task=None, state=None, **kwargs):
+    labels = (('task', task.name), ('queue', _get_queue(task.request.delivery_info)))
+    started = _started.pop(task_id, None)
+    if started is not None:
+        registry.observe('celery_task_runtime_seconds', labels, time.perf_counter() - started)
+    if state in STATES:
+        registry.inc('celery_tasks_total', labels + (('state', STATES[state]),))
+    write_snapshot(_directory)
+
+
+def flush_metrics(**kwargs):
+    write_snapshot(_directory, force=True)
+
+
+def retire_metrics(**kwargs):
+    # Pool processes are replaced after --max-tasks-per-child, every one would leave a file to merge on each scrape
+    retire_snapshot(_directory)
+
+
+def start_metrics_server(directory, port, host='127.0.0.1'):
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = read_metrics(directory).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Scrapes are not worth a log line each
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name='celery-metrics', daemon=True).start()
+    Logg.info(e='celery.metrics', msg='metrics server started', host=host, port=server.server_port)
+    return server
+
+
+@contextlib.contextmanager
+def _locked(directory, operation):
+    with open(Path(directory) / LOCK_FILENAME, 'a') as file:
+        fcntl.flock(file, operation)
+        yield
+
+
+def _get_queue(delivery_info):
+    return (delivery_info or {}).get('routing_key') or 'unknown'
+
+
+def _to_labels(labels):
+    return tuple(tuple(pair) for pair in labels)
+
+
+def _format_labels(labels):
+    escaped = (value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n') for _, value in labels)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + '}'
@@ -0,0 +1,65 @@
+from celery.beat import PersistentScheduler
+from django.conf import settings
+from django.core.cache import cache
+from redis.exceptions import RedisError
+
+from core.utils.locks import get_lease
+from core.utils.logger import Logg
+
+
+class LeaderScheduler(PersistentScheduler):
+    """Beat scheduler that can be embedded in every worker replica (`-B`), only the elected leader sends tasks.
+
+    Replicas compete for a lease renewed every `renew_interval` seconds, when the leader stops, another one
+    takes over after CELERY_BEAT_LOCK_TIMEOUT at most. The leader records each run in the shared cache and a
+    new leader resumes every entry from its last recorded run, so takeovers neither repeat nor postpone runs.
+    Entries never run by any leader start from now instead of catching up.
+    """
+
+    lease_name = 'celery:beat:leader'
+    last_run_prefix = 'celery:beat:last_run:'
+
+    def __init__(self, *args, **kwargs):
+        self.lease_timeout = settings.CELERY_BEAT_LOCK_TIMEOUT
+        self.renew_interval = self.lease_timeout / 3
+        self.lease = get_lease(self.lease_name, self.lease_timeout)
+        self.is_leader = False
+        super().__init__(*args, **kwargs)
+
+    def tick(self, *args, **kwargs):
+        if not self.elect():
+            return self.renew_interval
+        # Sleep no longer than the lease can be left without renewal
+        return min(super().tick(*args, **kwargs), self.renew_interval)
+
+    def elect(self):
+        was_leader = self.is_leader
+        self.is_leader = self.lease.renew() if was_leader else self.lease.acquire()
+        if self.is_leader and not was_leader:
+            self.reset_last_run()
+            Logg.info(e='celery.beat', msg='became leader')
+        elif was_leader and not self.is_leader:
+            Logg.warning(e='celery.beat', msg='lost leadership')
+        return self.is_leader
+
+    def reset_last_run(self):
+        keys = {f'{self.last_run_prefix}{name}': name for name in self.schedule}
+        recorded = {keys[key]: last_run_at for key, last_run_at in cache.get_many(keys).items()}
+        now = self.app.now()
+        for name, entry in self.schedule.items():
+            entry.last_run_at = recorded.get(name, now)
+        self._heap = None  # Rebuilt with the new run times on the next tick
+
+    def reserve(self, entry):
+        new_entry = super().reserve(entry)
+        try:
+            cache.set(f'{self.last_run_prefix}{entry.name}', new_entry.last_run_at, timeout=None)
+        except RedisError as exc:  # The run is sent anyway, a takeover would only rerun it
+            Logg.warning(e='celery.beat', msg='last run not recorded', entry=entry.name, error=repr(exc))
+        return new_entry
+
+    def close(self):
+        if self.is_leader:
+            self.lease.release()
+            self.is_leader = False
+        super().close()
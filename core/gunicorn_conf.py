@@ -0,0 +1,100 @@
+"""Gunicorn settings and hooks, used with `gunicorn -c python:core.gunicorn_conf`.
+
+The app is preloaded in the master and objects alive at fork are moved out of the garbage collector's
+reach with `gc.freeze()`, so collections in workers don't write to the pages they share with the master.
+Workers are recycled when their RSS grew by GUNICORN_MAX_RSS_GROWTH_MB instead of after a request count.
+"""
+
+import gc
+import importlib
+import os
+import signal
+
+import environ
+
+env = environ.Env()
+
+WORKER_CLASSES = {
+    'sync': 'sync',
+    'gthread': 'gthread',
+    'asgi': 'uvicorn_worker.UvicornWorker',
+}
+
+server_mode = env.str('SERVER_MODE', 'wsgi')
+worker_kind = env.str('GUNICORN_WORKER_CLASS', 'asgi' if server_mode == 'asgi' else 'sync')  # sync | gthread | asgi
+if worker_kind not in WORKER_CLASSES:
+    raise ValueError(f'Unknown GUNICORN_WORKER_CLASS: {worker_kind}, use one of {", ".join(WORKER_CLASSES)}')
+
+wsgi_app = 'core.asgi:application' if worker_kind == 'asgi' else 'core.wsgi:application'
+worker_class = WORKER_CLASSES[worker_kind]
+workers = env.int('GUNICORN_WORKERS', 4)
+threads = env.int('GUNICORN_THREADS', 4) if worker_kind == 'gthread' else 1
+bind = env.str('GUNICORN_BIND', '0.0.0.0:8000')  # nosec B104 container port
+timeout = env.int('GUNICORN_TIMEOUT', 60)
+forwarded_allow_ips = '*'
+preload_app = env.bool('GUNICORN_PRELOAD', True)
+# A blind request count recycle, off by default in favour of the RSS growth limit
+max_requests = env.int('GUNICORN_MAX_REQUESTS', 0)
+max_requests_jitter = env.int('GUNICORN_MAX_REQUESTS_JITTER', 50)
+
+max_rss_growth_mb = env.int('GUNICORN_MAX_RSS_GROWTH_MB', 256)  # 0 disables RSS recycling
+rss_check_interval = env.float('GUNICORN_RSS_CHECK_INTERVAL', 10.0)  # Seconds between RSS samples per worker
+
+if preload_app:
+    # Collections in the master would free objects between pages the workers share, leaving holes
+    # that later allocations in the workers fill, which copies the pages. Collected again in workers.
+    gc.disable()
+
+
+def when_ready(server):
+    if preload_app:
+        # Django imports the URLconf with every view and serializer on the first request, do it once here
+        from django.conf import settings
+
+        importlib.import_module(settings.ROOT_URLCONF)
+
+
+def pre_fork(server, worker):
+    if preload_app:
+        gc.freeze()  # Everything the master holds now is ignored by collections in the child
+
+
+def post_fork(server, worker):
+    if preload_app:
+        gc.enable()
+
+
+def post_worker_init(worker):
+    if not max_rss_growth_mb:
+        return
+    from core.utils.memory import RssRecycler
+
+    worker.rss_recycler = RssRecycler(
+        max_growth=max_rss_growth_mb * 2**20,
+        interval=rss_check_interval,
+        on_recycle=lambda rss, baseline: recycle(worker, rss, baseline),
+    )
+    worker.rss_recycler.start()
+
+
+def recycle(worker, rss, baseline):
+    from core.utils.logger import Logg
+
+    Logg.warning(
+        e='gunicorn.recycle',
+        msg='worker RSS grew over the limit, restarting',
+        pid=worker.pid,
+        requests=worker.nr,
+        rss_mb=round(rss / 2**20, 1),
+        baseline_mb=round(baseline / 2**20, 1),
+        growth_mb=round((rss - baseline) / 2**20, 1),
+        limit_mb=max_rss_growth_mb,
+    )
+    # Graceful for every worker class: in-flight requests finish, the master starts a replacement
+    os.kill(worker.pid, signal.SIGTERM)
+
+
+def worker_exit(server, worker):
+    recycler = getattr(worker, 'rss_recycler', None)
+    if recycler is not None:
+        recycler.stop()
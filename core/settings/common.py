@@ -1,6 +1,7 @@
 # https://github.com/bubaley/production-django-docker-example
 # version: 0.0.0 | Increase the version after changes from the template, this will make
 import datetime
+import os
 import sys
 from pathlib import Path
 
@@ -21,7 +22,15 @@ SECRET_KEY = env.str('SECRET_KEY')
 ALLOWED_HOSTS = env.list('ALLOWED_HOST', default=['*'])
 CORS_ORIGIN_WHITELIST = env.list('CORS_ORIGIN_WHITELIST', default=['http://localhost:8080'])
 
-LOGGING = init_logging(log_dir=BASE_DIR / 'data' / 'logs', debug=DEBUG)
+LOGGING = init_logging(
+    log_dir=BASE_DIR / 'data' / 'logs',
+    debug=DEBUG,
+    queue_enabled=env.bool('LOG_QUEUE_ENABLED', False),  # Write stdout logs from a background thread in batches
+    queue_size=env.int('LOG_QUEUE_SIZE', 10000),
+    queue_batch_size=env.int('LOG_QUEUE_BATCH_SIZE', 100),
+    queue_overflow=env.str('LOG_QUEUE_OVERFLOW', 'drop'),  # drop | block
+    level=env.str('LOG_LEVEL', 'DEBUG'),
+)
 
 INSTALLED_APPS = [
     'django.contrib.admin',
@@ -39,6 +48,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.utils.middleware.PerformanceMiddleware',
+    'core.utils.middleware.PrimaryStickinessMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -68,6 +79,19 @@ TEMPLATES = [
 
 ROOT_URLCONF = 'core.urls'
 WSGI_APPLICATION = 'core.wsgi.application'
+ASGI_APPLICATION = 'core.asgi.application'
+SERVER_MODE = env.str('SERVER_MODE', 'wsgi')  # wsgi | asgi, asgi routes async viewsets
+
+# psycopg pool per process when SQL_POOL_ENABLED, otherwise connections persist for SQL_CONN_MAX_AGE seconds.
+# Persistent connections are per thread, ASGI runs sync code in a thread per request: prefer the pool there.
+SQL_POOL_ENABLED = env.bool('SQL_POOL_ENABLED', False)
+SQL_POOL = {
+    'min_size': env.int('SQL_POOL_MIN_SIZE', 2),
+    'max_size': env.int('SQL_POOL_MAX_SIZE', 10),
+    'timeout': env.float('SQL_POOL_TIMEOUT', 10.0),  # Seconds to wait for a free connection
+    'max_idle': env.float('SQL_POOL_MAX_IDLE', 600.0),
+    'max_lifetime': env.float('SQL_POOL_MAX_LIFETIME', 3600.0),
+}
 
 if env.str('SQL_ENGINE', None):
     DATABASES = {
@@ -78,9 +102,21 @@ if env.str('SQL_ENGINE', None):
             'PASSWORD': env.str('SQL_PASSWORD'),
             'HOST': env.str('SQL_HOST'),
             'PORT': env.str('SQL_PORT'),
+            'CONN_MAX_AGE': 0 if SQL_POOL_ENABLED else env.int('SQL_CONN_MAX_AGE', 0 if SERVER_MODE == 'asgi' else 60),
+            'CONN_HEALTH_CHECKS': True,  # Also enables the pool's connection check
+            'OPTIONS': {'pool': SQL_POOL} if SQL_POOL_ENABLED else {},
             'TEST': {'NAME': 'test_' + env.str('SQL_DATABASE')},
         }
     }
+    # Read replicas as host or host:port, sharing the primary's database and credentials
+    for index, replica in enumerate(env.list('SQL_REPLICA_HOSTS', default=[])):
+        host, _, port = replica.partition(':')
+        DATABASES[f'replica_{index}'] = {
+            **DATABASES['default'],
+            'HOST': host,
+            'PORT': port or DATABASES['default']['PORT'],
+            'TEST': {'MIRROR': 'default'},
+        }
 else:
     DATABASES = {
         'default': {
@@ -90,6 +126,10 @@ else:
         }
     }
 
+DATABASE_ROUTERS = ['core.utils.db.PrimaryReplicaRouter']
+# Seconds a client's reads stay on the primary after it writes, cover the replicas' usual lag
+SQL_REPLICA_STICKY_SECONDS = env.int('SQL_REPLICA_STICKY_SECONDS', 5)
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -112,10 +152,10 @@ MEDIA_ROOT = BASE_DIR / 'data' / 'media'
 MEDIA_URL = 'media/'
 
 REST_FRAMEWORK = {
-    'DEFAULT_AUTHENTICATION_CLASSES': ('rest_framework_simplejwt.authentication.JWTAuthentication',),
+    'DEFAULT_AUTHENTICATION_CLASSES': ('user.authentication.CachedJWTAuthentication',),
     'DATETIME_FORMAT': '%Y-%m-%d %H:%M:%S',
     'DEFAULT_PAGINATION_CLASS': 'core.utils.pagination.BasePagination',
-    'DEFAULT_RENDERER_CLASSES': ('rest_framework.renderers.JSONRenderer',),
+    'DEFAULT_RENDERER_CLASSES': ('core.utils.renderers.JSONRenderer',),
     'DEFAULT_FILTER_BACKENDS': ('django_filters.rest_framework.DjangoFilterBackend',),
 }
 
@@ -124,23 +164,64 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': datetime.timedelta(days=30),
     'ROTATE_REFRESH_TOKENS': True,
     'UPDATE_LAST_LOGIN': True,
+    'TOKEN_OBTAIN_SERIALIZER': 'user.serializers.TokenObtainPairSerializer',  # nosec B105 dotted path, not a secret
 }
+# Buffer last_login on token issue and write it in bulk from celery beat, every LAST_LOGIN_FLUSH_INTERVAL seconds
+LAST_LOGIN_BUFFERED = env.bool('LAST_LOGIN_BUFFERED', False)
+LAST_LOGIN_FLUSH_INTERVAL = env.int('LAST_LOGIN_FLUSH_INTERVAL', 30)
 
 AUTH_USER_MODEL = 'user.User'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 APPEND_SLASH = False
 
 CACHE_LOCATION_URL = env.str('CACHE_LOCATION_URL', None)
-backends = 'django.core.cache.backends'
+backends = 'core.utils.cache'  # Django backends that report hits and misses to PerformanceMiddleware
 CACHES = {
     'default': {
-        'BACKEND': f'{backends}.redis.RedisCache' if CACHE_LOCATION_URL else f'{backends}.db.DatabaseCache',
+        'BACKEND': f'{backends}.RedisCache' if CACHE_LOCATION_URL else f'{backends}.DatabaseCache',
         'LOCATION': CACHE_LOCATION_URL or 'app_cache',
         'TIMEOUT': 86400 * 7,  # 7 days
     }
 }
 
+# Two-tier read cache for API responses (core.utils.cache.read_cache), on by default when Redis is configured
+API_CACHE_ENABLED = env.bool('API_CACHE_ENABLED', bool(CACHE_LOCATION_URL))
+API_CACHE_TIMEOUT = env.int('API_CACHE_TIMEOUT', 300)
+API_CACHE_LOCAL_SIZE = env.int('API_CACHE_LOCAL_SIZE', 1024)  # Entries in the per-process LRU
+API_CACHE_LOCAL_TIMEOUT = env.int('API_CACHE_LOCAL_TIMEOUT', 30)
+AUTH_USER_CACHE_TIMEOUT = env.int('AUTH_USER_CACHE_TIMEOUT', 60)  # JWT users, see user.authentication
+
+# Bulk user import (manage.py import_users, POST users/import), see user.services.import_users
+USER_IMPORT_BATCH_SIZE = env.int('USER_IMPORT_BATCH_SIZE', 1000)
+# Password hashing processes of the import_users command, 0 hashes inline
+USER_IMPORT_WORKERS = env.int('USER_IMPORT_WORKERS', os.cpu_count() or 1)
+# Per request, hashed inline within the request timeout, larger imports go through the command
+USER_IMPORT_MAX_ROWS = env.int('USER_IMPORT_MAX_ROWS', 50)
+USER_EXPORT_CHUNK_SIZE = env.int('USER_EXPORT_CHUNK_SIZE', 2000)  # Rows per cursor fetch and per streamed chunk
+
+# Share of requests instrumented by PerformanceMiddleware (0..1), 0 turns instrumentation off
+PERFORMANCE_SAMPLE_RATE = env.float('PERFORMANCE_SAMPLE_RATE', 0.0)
+PERFORMANCE_SLOW_REQUEST_MS = env.int('PERFORMANCE_SLOW_REQUEST_MS', 0)  # Log requests slower than this, 0 disables
+PERFORMANCE_SERVER_TIMING = env.bool('PERFORMANCE_SERVER_TIMING', DEBUG)
+
+# Seconds api/v1/ready reuses its database, cache and broker checks in each process
+HEALTH_CHECK_CACHE_SECONDS = env.float('HEALTH_CHECK_CACHE_SECONDS', 5.0)
+HEALTH_CHECK_TIMEOUT = env.float('HEALTH_CHECK_TIMEOUT', 2.0)  # Seconds to wait for the broker
+
 CELERY_BROKER_URL = env.str('CELERY_BROKER_URL', None)
 CELERY_BACKEND_URL = env.str('CELERY_BACKEND_URL', None)
+# Run tasks in the calling process, the only case where buffers without Redis are seen by their consumer
+CELERY_TASK_ALWAYS_EAGER = env.bool('CELERY_TASK_ALWAYS_EAGER', TESTING)
+# Beat runs in every replica with -B, the holder of this lease (seconds) sends the tasks, see core.celery.scheduler
+CELERY_BEAT_LOCK_TIMEOUT = env.int('CELERY_BEAT_LOCK_TIMEOUT', 30)
+# Used by core.celery.autoscale with CELERY_AUTOSCALE=MAX,MIN: seconds a queued task may wait before the pool grows,
+# and processes kept for the urgent queue when the worker consumes it
+CELERY_AUTOSCALE_TARGET_LATENCY = env.float('CELERY_AUTOSCALE_TARGET_LATENCY', 5.0)
+CELERY_AUTOSCALE_URGENT_RESERVE = env.int('CELERY_AUTOSCALE_URGENT_RESERVE', 1)
+# Per-task and per-queue worker metrics in Prometheus text format, see core.celery.metrics
+CELERY_METRICS_ENABLED = env.bool('CELERY_METRICS_ENABLED', False)
+CELERY_METRICS_DIR = env.str('CELERY_METRICS_DIR', str(BASE_DIR / 'data' / 'celery-metrics'))
+CELERY_METRICS_HOST = env.str('CELERY_METRICS_HOST', '127.0.0.1')
+CELERY_METRICS_PORT = env.int('CELERY_METRICS_PORT', 9808)  # Served by the main worker process, 0 disables
 
 # --- CUSTOM_SETTINGS ---
@@ -0,0 +1,67 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+from kombu import Connection
+
+from core.celery.autoscale import QueueDepthAutoscaler, get_desired_concurrency
+
+
+class DesiredConcurrencyTests(SimpleTestCase):
+    """Tests for the queue depth autoscaling policy."""
+
+    def get(self, depths, active=0, rate=1.0, urgent_reserve=1, max_concurrency=8):
+        return get_desired_concurrency(
+            depths, active, rate, target_latency=5, urgent_reserve=urgent_reserve, max_concurrency=max_concurrency
+        )
+
+    def test_backlog_is_drained_within_target_latency(self):
+        """Test that a process is added per rate x latency waiting tasks."""
+        self.assertEqual(self.get({'default': 0}), 0)
+        self.assertEqual(self.get({'default': 5}), 1)
+        self.assertEqual(self.get({'default': 11}), 3)
+        self.assertEqual(self.get({'default': 11}, rate=2.0), 2)
+        self.assertEqual(self.get({'default': 5}, active=2), 3)
+
+    def test_urgent_keeps_reserved_capacity(self):
+        """Test that other queues can't take the capacity reserved for urgent."""
+        self.assertEqual(self.get({'urgent': 0, 'low': 0}, urgent_reserve=2), 2)
+        self.assertEqual(self.get({'urgent': 0, 'low': 1000}, urgent_reserve=2), 8)
+        self.assertEqual(self.get({'urgent': 20, 'low': 1000}, urgent_reserve=2), 8)
+        self.assertEqual(self.get({'low': 0}, urgent_reserve=2), 0)
+
+
+@override_settings(CELERY_AUTOSCALE_TARGET_LATENCY=5.0, CELERY_AUTOSCALE_URGENT_RESERVE=1)
+class QueueDepthAutoscalerTests(SimpleTestCase):
+    """Tests for applying the policy to the worker pool."""
+
+    def setUp(self):
+        """Build an autoscaler around a fake pool."""
+        self.pool = mock.Mock(num_processes=1)
+        self.autoscaler = QueueDepthAutoscaler(self.pool, max_concurrency=6, min_concurrency=1, worker=mock.Mock())
+
+    def test_pool_grows_with_depth_and_is_bounded(self):
+        """Test that queue depth grows the pool up to max_concurrency."""
+        with mock.patch.object(self.autoscaler, 'get_queue_depths', return_value={'default': 12, 'urgent': 0}):
+            self.autoscaler.maybe_scale()
+        self.pool.grow.assert_called_once_with(3)  # 3 for the backlog + 1 urgent reserve, 1 is running
+
+        self.autoscaler._polled_at = None
+        with mock.patch.object(self.autoscaler, 'get_queue_depths', return_value={'default': 500, 'urgent': 0}):
+            self.assertEqual(min(self.autoscaler.qty, self.autoscaler.max_concurrency), 6)
+
+    def test_broker_errors_keep_last_depths(self):
+        """Test that a failing depth poll reuses the previous depths."""
+        self.autoscaler.depths = {'default': 10}
+        self.autoscaler.worker.app.connection_for_read.side_effect = OSError('broker down')
+        self.assertEqual(self.autoscaler.qty, 2)
+
+    def test_missing_queues_count_as_empty(self):
+        """Test that queues the broker has no key for are read as 0 instead of failing the whole poll."""
+        connection = Connection('memory://')
+        self.addCleanup(connection.release)
+        with connection.channel() as channel:
+            channel.queue_declare(queue='default')
+            channel.basic_publish(channel.prepare_message('{}'), exchange='', routing_key='default')
+        self.autoscaler.worker.app.amqp.queues.consume_from = {'default': None, 'urgent': None}
+        self.autoscaler.worker.app.connection_for_read.return_value = connection
+        self.assertEqual(self.autoscaler.get_queue_depths(), {'default': 1, 'urgent': 0})
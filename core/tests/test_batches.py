@@ -0,0 +1,58 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from core.celery.batches import batched_task
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class BatchedTaskTests(TestCase):
+    """Tests for the batched celery task primitive."""
+
+    def setUp(self):
+        """Register a batched task that fails on 'bad' items."""
+        self.groups = []
+
+        def handler(items):
+            if 'bad' in items:
+                raise ValueError('bad item')
+            self.groups.append(items)
+
+        self.batch = batched_task(name=f'tests.batch.{self._testMethodName}', max_size=3, max_wait=2)(handler)
+
+    def test_full_group_sends_consume_right_away(self):
+        """Test that filling a group sends a consume task without countdown."""
+        with mock.patch.object(self.batch.task, 'apply_async') as apply_async:
+            self.batch.enqueue('a', 'b', 'c')
+        apply_async.assert_called_once_with()
+
+    def test_partial_group_schedules_one_delayed_consume(self):
+        """Test that a partial group schedules a single consume after max_wait."""
+        with mock.patch.object(self.batch.task, 'apply_async') as apply_async:
+            self.batch.enqueue('a')
+            self.batch.enqueue('b')
+        apply_async.assert_called_once_with(countdown=2)
+
+    def test_consume_processes_group_and_reports_failed_items(self):
+        """Test that one invocation handles a group and isolates failing items."""
+        with mock.patch.object(self.batch.task, 'apply_async') as apply_async:
+            self.batch.buffer.push('"a"', '"bad"', '"b"', '"c"')
+            result = self.batch.consume()
+        self.assertEqual(result['processed'], 3)
+        self.assertEqual([failure['item'] for failure in result['failed']], ['bad'])
+        self.assertEqual(self.groups, [['a'], ['b']])
+        # The leftover item waits for the next delayed consume
+        apply_async.assert_called_once_with(countdown=2)
+        self.assertEqual(self.batch.consume()['processed'], 1)
+        self.assertEqual(self.groups[-1], ['c'])
+
+    def test_items_travel_in_message_without_shared_buffer(self):
+        """Test that without Redis or eager tasks items are sent with the task instead of a local buffer."""
+        with override_settings(CELERY_TASK_ALWAYS_EAGER=False):
+            batch = batched_task(name='tests.batch.unbuffered', max_size=3)(self.groups.append)
+        self.assertIsNone(batch.buffer)
+        with mock.patch.object(batch.task, 'apply_async') as apply_async:
+            batch.enqueue('a', 'b')
+        apply_async.assert_called_once_with(args=[['a', 'b']])
+        self.assertEqual(batch.consume(['a', 'b'])['processed'], 2)
+        self.assertEqual(self.groups, [['a', 'b']])
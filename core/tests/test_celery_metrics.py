@@ -0,0 +1,99 @@
+import json
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from core.celery import metrics
+
+
+class CeleryMetricsTests(SimpleTestCase):
+    """Tests for celery worker metrics."""
+
+    def setUp(self):
+        """Use a fresh registry and a temporary snapshot directory."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        patches = [
+            mock.patch.object(metrics, 'registry', metrics.MetricsRegistry()),
+            mock.patch.object(metrics, '_directory', Path(self.directory.name)),
+            mock.patch.object(metrics, '_last_write', 0.0),
+            mock.patch.object(metrics, '_pending_write', None),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.addCleanup(lambda: metrics._pending_write and metrics._pending_write.cancel())
+
+    def run_task(self, state, published_ago=None):
+        request = SimpleNamespace(delivery_info={'routing_key': 'low'})
+        if published_ago is not None:
+            request.published_at = time.time() - published_ago
+        task = SimpleNamespace(name='user.example', request=request)
+        metrics.start_timer(task_id='1', task=task)
+        metrics.stop_timer(task_id='1', task=task, state=state)
+
+    def test_signals_record_counters_and_histograms(self):
+        """Test that task runs are counted by state with runtime and queue wait histograms."""
+        self.run_task('SUCCESS', published_ago=0.2)
+        self.run_task('FAILURE')
+        self.run_task('RETRY')
+        metrics.flush_metrics()
+
+        text = metrics.read_metrics(self.directory.name)
+        labels = 'task="user.example",queue="low"'
+        for state in ('success', 'failure', 'retry'):
+            self.assertIn(f'celery_tasks_total{{{labels},state="{state}"}} 1', text)
+        self.assertIn(f'celery_task_runtime_seconds_count{{{labels}}} 3', text)
+        self.assertIn(f'celery_task_queue_wait_seconds_bucket{{{labels},le="0.1"}} 0', text)
+        self.assertIn(f'celery_task_queue_wait_seconds_bucket{{{labels},le="0.25"}} 1', text)
+        self.assertIn(f'celery_task_queue_wait_seconds_bucket{{{labels},le="+Inf"}} 1', text)
+
+    def test_snapshots_of_processes_are_merged(self):
+        """Test that counters from every process file are summed."""
+        request = SimpleNamespace(name='user.example', delivery_info={'routing_key': 'low'})
+        metrics.count_received(request=request)
+        metrics.flush_metrics()
+        other = metrics.MetricsRegistry()
+        other.inc('celery_tasks_total', (('task', 'user.example'), ('queue', 'low'), ('state', 'received')), 2)
+        (Path(self.directory.name) / '1.json').write_text(json.dumps(other.snapshot()))
+
+        text = metrics.read_metrics(self.directory.name)
+        self.assertIn('celery_tasks_total{task="user.example",queue="low",state="received"} 3', text)
+
+    def test_retired_processes_are_folded_into_one_file(self):
+        """Test that exiting pool processes sum their counts into the retired file and remove their own."""
+        labels = (('task', 'user.example'), ('queue', 'low'), ('state', 'received'))
+        directory = Path(self.directory.name)
+        for pid in (101, 102):
+            metrics.registry.clear()
+            metrics.registry.inc('celery_tasks_total', labels)
+            with mock.patch('os.getpid', return_value=pid):
+                metrics.flush_metrics()
+                self.assertTrue((directory / f'{pid}.json').exists())
+                metrics.retire_metrics()
+
+        self.assertEqual([path.name for path in directory.glob('*.json')], [metrics.RETIRED_FILENAME])
+        self.assertIn('state="received"} 2', metrics.read_metrics(directory))
+
+    def test_publish_stamps_header(self):
+        """Test that published tasks carry their publish time."""
+        headers = {}
+        metrics.stamp_published_at(headers=headers)
+        self.assertAlmostEqual(headers['published_at'], time.time(), delta=1)
+
+    def test_skipped_write_is_caught_up_after_interval(self):
+        """Test that counts written within the interval reach the snapshot once it is over."""
+        labels = (('task', 'user.example'), ('queue', 'low'), ('state', 'received'))
+        metrics.registry.inc('celery_tasks_total', labels)
+        metrics.write_snapshot(self.directory.name, interval=0.5)
+        metrics.registry.inc('celery_tasks_total', labels)
+        metrics.write_snapshot(self.directory.name, interval=0.5)
+        pending = metrics._pending_write
+        self.assertIn('state="received"} 1', metrics.read_metrics(self.directory.name))
+
+        pending.join(timeout=2)
+        self.assertIn('state="received"} 2', metrics.read_metrics(self.directory.name))
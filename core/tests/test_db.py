@@ -0,0 +1,109 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+
+from core.utils import db
+from core.utils.middleware import PrimaryStickinessMiddleware
+
+User = get_user_model()
+
+
+class ForgetInheritedConnectionsTests(SimpleTestCase):
+    """Tests for dropping the parent's connections in a forked child."""
+
+    def setUp(self):
+        """Reset the references kept from earlier calls."""
+        self.addCleanup(db._inherited.clear)
+
+    def test_child_reconnects_without_closing_parent_connection(self):
+        """Test that the inherited connection is kept alive but no longer used."""
+        inherited = mock.Mock()
+        with mock.patch.object(connections['default'], 'connection', inherited):
+            db.forget_inherited_connections()
+            self.assertIsNone(connections['default'].connection)
+        inherited.close.assert_not_called()
+        self.assertIn(inherited, db._inherited)
+
+    def test_inherited_pools_are_dropped(self):
+        """Test that the child opens its own pool instead of the parent's."""
+        pool = mock.Mock()
+        pools = {'default': pool}
+        with mock.patch.object(type(connections['default']), '_connection_pools', pools, create=True):
+            db.forget_inherited_connections()
+        self.assertEqual(pools, {})
+        pool.close.assert_not_called()
+        self.assertIn(pool, db._inherited)
+
+
+class PrimaryReplicaRouterTests(SimpleTestCase):
+    """Tests for routing reads to replicas and writes to the primary."""
+
+    def setUp(self):
+        """Create a router with one replica alias, which is never connected to."""
+        self.router = db.PrimaryReplicaRouter()
+        self.router.replicas = ['replica_0']
+
+    def test_reads_go_to_replicas_and_writes_to_primary(self):
+        """Test the default routing outside of requests."""
+        self.assertEqual(self.router.db_for_read(User), 'replica_0')
+        self.assertEqual(self.router.db_for_write(User), 'default')
+        self.assertEqual(self.router.db_for_read(User), 'replica_0')
+        self.assertFalse(self.router.allow_migrate('replica_0', 'user'))
+
+    def test_reads_stay_on_primary_when_pinned(self):
+        """Test use_primary, transactions and primary-only apps."""
+        with db.use_primary():
+            self.assertEqual(self.router.db_for_read(User), 'default')
+        with mock.patch.object(connections['default'], 'in_atomic_block', True):
+            self.assertEqual(self.router.db_for_read(User), 'default')
+        cache_model = mock.Mock(**{'_meta.app_label': 'django_cache'})
+        self.assertEqual(self.router.db_for_read(cache_model), 'default')
+
+    def test_request_sticks_to_primary_after_write(self):
+        """Test that reads after a write in the same request go to the primary."""
+        token = db.begin_request()
+        try:
+            self.assertEqual(self.router.db_for_read(User), 'replica_0')
+            self.router.db_for_write(User)
+            self.assertEqual(self.router.db_for_read(User), 'default')
+        finally:
+            self.assertTrue(db.end_request(token).written)
+
+
+@mock.patch('core.utils.middleware.get_replicas', return_value=['replica_0'])
+class PrimaryStickinessMiddlewareTests(SimpleTestCase):
+    """Tests for carrying the primary window across a client's requests."""
+
+    def setUp(self):
+        """Create a router with one replica alias."""
+        self.router = db.PrimaryReplicaRouter()
+        self.router.replicas = ['replica_0']
+        self.factory = RequestFactory()
+
+    def test_write_sets_sticky_cookie(self, _):
+        """Test that a writing request marks the client for the sticky window."""
+
+        def view(request):
+            self.router.db_for_write(User)
+            return HttpResponse()
+
+        response = PrimaryStickinessMiddleware(view)(self.factory.post('/'))
+        self.assertEqual(response.cookies['db_primary']['max-age'], 5)
+
+    def test_sticky_client_reads_primary(self, _):
+        """Test that the next request of a client that wrote reads from the primary."""
+        databases = []
+
+        def view(request):
+            databases.append(self.router.db_for_read(User))
+            return HttpResponse()
+
+        middleware = PrimaryStickinessMiddleware(view)
+        response = middleware(self.factory.get('/'))
+        self.factory.cookies['db_primary'] = '1'
+        middleware(self.factory.get('/'))
+        self.assertEqual(databases, ['replica_0', 'default'])
+        self.assertNotIn('db_primary', response.cookies)
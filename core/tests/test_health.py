@@ -0,0 +1,41 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from core.utils import health
+
+
+@override_settings(HEALTH_CHECK_CACHE_SECONDS=60, CELERY_BROKER_URL=None)
+class HealthTests(TestCase):
+    """Tests for the liveness and readiness probes."""
+
+    def setUp(self):
+        """Forget readiness results of earlier tests."""
+        health._result = None
+        self.addCleanup(setattr, health, '_result', None)
+
+    def test_live_checks_nothing(self):
+        """Test that liveness answers without running dependency checks."""
+        with mock.patch.object(health, 'run_checks') as run_checks:
+            response = self.client.get('/api/v1/live')
+        self.assertEqual(response.status_code, 200)
+        run_checks.assert_not_called()
+
+    def test_ready_reports_dependencies(self):
+        """Test that readiness checks the database and cache."""
+        response = self.client.get('/api/v1/ready/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'success': True, 'checks': {'database': True, 'cache': True}})
+
+    def test_ready_fails_with_dependency_and_caches_result(self):
+        """Test that a failing check returns 503 and repeated probes reuse the result."""
+        with mock.patch.object(health, 'check_cache', side_effect=ConnectionError('cache down')) as check_cache:
+            responses = [self.client.get('/api/v1/ready') for _ in range(3)]
+        self.assertEqual([response.status_code for response in responses], [503] * 3)
+        self.assertFalse(responses[0].json()['checks']['cache'])
+        check_cache.assert_called_once()
+
+    @override_settings(CELERY_BROKER_URL='redis://broker:6379/0')
+    def test_broker_is_checked_when_configured(self):
+        """Test that the broker check only runs with a broker configured."""
+        self.assertIn('broker', health.get_checks())
@@ -0,0 +1,82 @@
+import io
+import json
+import logging
+import threading
+from unittest import mock
+
+from django.test import SimpleTestCase
+from loguru import logger
+
+from core.utils.logger import OVERFLOW_DROP, Logg, LoguruHandler, QueueSink
+
+
+class BlockingStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writing = threading.Event()
+        self.release = threading.Event()
+
+    def write(self, value):
+        self.writing.set()
+        self.release.wait(timeout=5)
+        return super().write(value)
+
+
+class QueueSinkTests(SimpleTestCase):
+    """Tests for the queued log sink."""
+
+    def test_messages_are_written_in_order(self):
+        """Test that queued messages reach the stream after drain."""
+        stream = io.StringIO()
+        sink = QueueSink(stream, queue_size=100, batch_size=10)
+        for index in range(25):
+            sink.write(f'message {index}\n')
+        sink.drain()
+        self.assertEqual(stream.getvalue().splitlines(), [f'message {index}' for index in range(25)])
+        sink.stop()
+
+    def test_overflow_drop_reports_dropped_count(self):
+        """Test that records over the queue size are dropped and reported instead of blocking."""
+        stream = BlockingStream()
+        sink = QueueSink(stream, queue_size=2, batch_size=10, overflow=OVERFLOW_DROP)
+        sink.write('first\n')
+        stream.writing.wait(timeout=5)  # The writer thread holds `first` and waits on the stream
+        for index in range(5):
+            sink.write(f'queued {index}\n')
+        stream.release.set()
+        sink.stop()
+
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(lines[:3], ['first', 'queued 0', 'queued 1'])
+        self.assertEqual(json.loads(lines[3]), {'e': 'logging.dropped', 'count': 3})
+
+
+class LoguruHandlerTests(SimpleTestCase):
+    """Tests for forwarding stdlib records to loguru."""
+
+    def setUp(self):
+        self.records = []
+        self.sink_id = logger.add(lambda message: self.records.append(message.record), level='DEBUG')
+        self.std_logger = logging.getLogger('app.tests.handler')
+        self.std_logger.addHandler(LoguruHandler())
+        self.std_logger.propagate = False
+
+    def tearDown(self):
+        logger.remove(self.sink_id)
+        self.std_logger.handlers.clear()
+
+    def test_record_points_to_the_caller(self):
+        """Test that the loguru record keeps the stdlib caller's function and line."""
+        self.std_logger.warning('handled')
+        self.assertEqual(self.records[-1]['function'], 'test_record_points_to_the_caller')
+        self.assertEqual(self.records[-1]['file'].path, __file__)
+
+    def test_disabled_level_skips_serialization(self):
+        """Test that records below the configured level are not serialized."""
+        with (
+            mock.patch('core.utils.logger._min_level_no', logging.WARNING),
+            mock.patch.object(Logg, '_serialize_message') as serialize,
+        ):
+            Logg.info(e='user.test')
+            self.std_logger.info('skipped')
+        serialize.assert_not_called()
@@ -0,0 +1,24 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from core.utils import memory
+
+
+class RssRecyclerTests(SimpleTestCase):
+    """Tests for recycling processes on RSS growth."""
+
+    def test_get_rss_reports_current_process(self):
+        """Test that RSS is read in bytes."""
+        self.assertGreater(memory.get_rss(), 2**20)
+
+    def test_recycles_once_growth_reaches_limit(self):
+        """Test that on_recycle gets the RSS and baseline once growth reaches max_growth."""
+        on_recycle = mock.Mock()
+        recycler = memory.RssRecycler(max_growth=100, interval=60, on_recycle=on_recycle)
+        with mock.patch.object(memory, 'get_rss', side_effect=[1000, 1099, 1100]):
+            recycler.start()
+            recycler.stop()
+            self.assertFalse(recycler.check())
+            self.assertTrue(recycler.check())
+        on_recycle.assert_called_once_with(1100, 1000)
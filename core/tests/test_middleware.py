@@ -0,0 +1,29 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+
+class PerformanceMiddlewareTests(TestCase):
+    """Tests for per-request performance instrumentation."""
+
+    @override_settings(PERFORMANCE_SAMPLE_RATE=1.0, PERFORMANCE_SERVER_TIMING=True)
+    def test_sampled_request_is_logged_with_server_timing(self):
+        """Test that a sampled request gets a Server-Timing header and one http.request event."""
+        with mock.patch('core.utils.middleware.Logg') as logg:
+            response = self.client.get('/api/v1/users')
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('render;dur=', response['Server-Timing'])
+        logg.info.assert_called_once()
+        event = logg.info.call_args.kwargs
+        self.assertEqual(event['e'], 'http.request')
+        self.assertEqual(event['status'], 200)
+        self.assertGreaterEqual(event['db_queries'], 1)
+
+    @override_settings(PERFORMANCE_SAMPLE_RATE=0.0, PERFORMANCE_SLOW_REQUEST_MS=0)
+    def test_request_is_not_instrumented_when_sampling_is_off(self):
+        """Test that nothing is measured or logged when sampling and the slow threshold are off."""
+        with mock.patch('core.utils.middleware.Logg') as logg:
+            response = self.client.get('/api/v1/users')
+        self.assertNotIn('Server-Timing', response)
+        logg.info.assert_not_called()
+        logg.warning.assert_not_called()
@@ -0,0 +1,71 @@
+import datetime
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from celery.beat import PersistentScheduler
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from core import celery_app
+from core.celery.scheduler import LeaderScheduler
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class LeaderSchedulerTests(TestCase):
+    """Tests for the lease-coordinated beat scheduler."""
+
+    def setUp(self):
+        """Create two replicas with their own schedule files."""
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.replicas = [
+            LeaderScheduler(app=celery_app, schedule_filename=str(Path(directory.name) / f'beat-{index}'))
+            for index in range(2)
+        ]
+        for replica in self.replicas:
+            self.addCleanup(replica.close)
+
+    def test_only_leader_sends_tasks(self):
+        """Test that one replica ticks the schedule while the other one waits."""
+        leader, follower = self.replicas
+        with mock.patch.object(PersistentScheduler, 'tick', return_value=1) as tick:
+            self.assertEqual(leader.tick(), 1)
+            self.assertEqual(follower.tick(), follower.renew_interval)
+            self.assertEqual(leader.tick(), 1)
+        self.assertEqual(tick.call_count, 2)
+        self.assertTrue(leader.is_leader)
+        self.assertFalse(follower.is_leader)
+
+    def test_follower_takes_over_after_leader_stops(self):
+        """Test that the lease moves to another replica once the leader closes."""
+        leader, follower = self.replicas
+        self.assertTrue(leader.elect())
+        self.assertFalse(follower.elect())
+        leader.close()
+        self.assertTrue(follower.elect())
+
+    def test_new_leader_restarts_entries_from_now(self):
+        """Test that a new leader doesn't catch up on runs it missed as a follower."""
+        leader = self.replicas[0]
+        self.assertTrue(leader.schedule)
+        for entry in leader.schedule.values():
+            entry.last_run_at = leader.app.now() - datetime.timedelta(days=1)
+        leader.elect()
+        for entry in leader.schedule.values():
+            self.assertLess((leader.app.now() - entry.last_run_at).total_seconds(), 5)
+
+    def test_new_leader_resumes_recorded_runs(self):
+        """Test that a new leader keeps the run times recorded by the previous one."""
+        leader, follower = self.replicas
+        self.assertTrue(leader.elect())
+        name, *others = leader.schedule
+        last_run_at = leader.reserve(leader.schedule[name]).last_run_at
+        for entry in follower.schedule.values():
+            entry.last_run_at = follower.app.now() - datetime.timedelta(days=1)
+        leader.close()
+        self.assertTrue(follower.elect())
+        self.assertEqual(follower.schedule[name].last_run_at, last_run_at)
+        for other in others:
+            self.assertLess((follower.app.now() - follower.schedule[other].last_run_at).total_seconds(), 5)
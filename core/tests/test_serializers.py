@@ -0,0 +1,74 @@
+from django.test import SimpleTestCase
+from rest_framework import serializers
+
+from core.utils.serializers import ReadLayout, sparse_serializer
+from user.models import User
+
+
+class ReadLayoutTests(SimpleTestCase):
+    """Tests for compiling serializers into read layouts."""
+
+    def test_represents_rows_and_instances_like_serializer(self):
+        """Test that dict rows and instances give the serializer's data, nulls included."""
+
+        class Serializer(serializers.ModelSerializer):
+            class Meta:
+                model = User
+                fields = ('id', 'email', 'phone', 'is_staff', 'date_joined')
+
+        user = User(id=7, email='layout@example.com', phone=None, is_staff=True)
+        layout = ReadLayout.compile(Serializer())
+        expected = Serializer(user).data
+        self.assertEqual(layout.columns, ('id', 'email', 'phone', 'is_staff', 'date_joined'))
+        self.assertEqual(layout.bind(user).data, expected)
+        self.assertEqual(
+            layout.bind([{field: getattr(user, field) for field in layout.columns}], many=True).data, [expected]
+        )
+
+    def test_computed_fields_are_not_compiled(self):
+        """Test that method, property and relation fields fall back to the serializer."""
+
+        class MethodSerializer(serializers.ModelSerializer):
+            name = serializers.SerializerMethodField()
+
+            class Meta:
+                model = User
+                fields = ('id', 'name')
+
+        class PropertySerializer(serializers.ModelSerializer):
+            active = serializers.BooleanField(source='is_authenticated')
+
+            class Meta:
+                model = User
+                fields = ('id', 'active')
+
+        self.assertIsNone(ReadLayout.compile(MethodSerializer()))
+        self.assertIsNone(ReadLayout.compile(PropertySerializer()))
+
+    def test_custom_representation_is_not_compiled(self):
+        """Test that serializers overriding to_representation fall back to it."""
+
+        class Serializer(serializers.ModelSerializer):
+            class Meta:
+                model = User
+                fields = ('id', 'email')
+
+            def to_representation(self, instance):
+                return {**super().to_representation(instance), 'email': instance.email.lower()}
+
+        self.assertIsNone(ReadLayout.compile(Serializer()))
+
+    def test_sparse_serializer_keeps_write_only_fields(self):
+        """Test that sparse subclasses narrow readable fields only and are reused."""
+
+        class Serializer(serializers.ModelSerializer):
+            password = serializers.CharField(write_only=True)
+
+            class Meta:
+                model = User
+                fields = ('id', 'email', 'phone', 'password')
+
+        sparse = sparse_serializer(Serializer, ('email',))
+        self.assertIs(sparse, sparse_serializer(Serializer, ('email',)))
+        self.assertEqual(list(sparse().fields), ['email', 'password'])
+        self.assertEqual(ReadLayout.compile(sparse()).columns, ('email',))
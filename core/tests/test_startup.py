@@ -0,0 +1,37 @@
+import io
+import json
+import os
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+
+class ProfileStartupTests(SimpleTestCase):
+    """Tests for the cold start profiler."""
+
+    def test_web_process_starts_without_celery(self):
+        """Test that a WSGI process serves its first request without importing the celery stack."""
+        with tempfile.TemporaryDirectory() as directory:
+            output = Path(directory) / 'startup.json'
+            call_command('profile_startup', repeat=1, limit=10000, output=output, stdout=io.StringIO())
+            report = json.loads(output.read_text())
+        self.assertEqual(report['status'], 200)
+        self.assertGreater(report['first_request_ms'], report['app_ready_ms'])
+        packages = {name for name, _ in report['packages']}
+        self.assertIn('django', packages)
+        self.assertFalse(packages & {'celery', 'kombu', 'billiard'})
+
+    def test_readiness_probe_checks_broker_without_celery(self):
+        """Test that the broker check of api/v1/ready connects through kombu without loading the celery app."""
+        with tempfile.TemporaryDirectory() as directory, mock.patch.dict(os.environ, CELERY_BROKER_URL='memory://'):
+            output = Path(directory) / 'startup.json'
+            call_command(
+                'profile_startup', path='/api/v1/ready', repeat=1, limit=10000, output=output, stdout=io.StringIO()
+            )
+            report = json.loads(output.read_text())
+        packages = {name for name, _ in report['packages']}
+        self.assertIn('kombu', packages)  # The broker was checked, other checks depend on the local database
+        self.assertNotIn('celery', packages)
@@ -0,0 +1,138 @@
+import threading
+import uuid
+from collections import deque
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.redis import RedisCache
+
+
+class RedisHashBuffer:
+    """Last-write-wins mapping shared between processes through a Redis hash.
+
+    Producers `put` with one HSET, a consumer `drain`s everything atomically by renaming the hash first.
+    """
+
+    def __init__(self, name: str):
+        self.key = cache.make_key(f'buffer:{name}')
+
+    @property
+    def client(self):
+        return cache._cache.get_client(write=True)
+
+    def put(self, field: str, value: str):
+        self.client.hset(self.key, field, value)
+
+    def drain(self) -> dict[str, str]:
+        from redis.exceptions import ResponseError  # Loaded by the Redis cache already, not by every web process
+
+        draining_key = f'{self.key}:draining:{uuid.uuid4().hex}'
+        try:
+            self.client.rename(self.key, draining_key)
+        except ResponseError:  # Nothing buffered
+            return {}
+        pipeline = self.client.pipeline()
+        pipeline.hgetall(draining_key)
+        pipeline.delete(draining_key)
+        items, _ = pipeline.execute()
+        return {field.decode(): value.decode() for field, value in items.items()}
+
+    def restore(self, items: dict[str, str]):
+        # Values put since the drain are newer, keep them
+        pipeline = self.client.pipeline()
+        for field, value in items.items():
+            pipeline.hsetnx(self.key, field, value)
+        pipeline.execute()
+
+
+class LocalHashBuffer:
+    """Process-local stand-in for RedisHashBuffer, when celery runs tasks eagerly without Redis."""
+
+    _buffers = {}
+    _lock = threading.Lock()
+
+    def __init__(self, name: str):
+        with self._lock:
+            self.items = self._buffers.setdefault(name, {})
+
+    def put(self, field: str, value: str):
+        with self._lock:
+            self.items[field] = value
+
+    def drain(self) -> dict[str, str]:
+        with self._lock:
+            items = self.items.copy()
+            self.items.clear()
+        return items
+
+    def restore(self, items: dict[str, str]):
+        with self._lock:
+            for field, value in items.items():
+                self.items.setdefault(field, value)
+
+
+class RedisListBuffer:
+    """FIFO of strings shared between processes through a Redis list."""
+
+    def __init__(self, name: str):
+        self.key = cache.make_key(f'buffer:{name}')
+
+    @property
+    def client(self):
+        return cache._cache.get_client(write=True)
+
+    def push(self, *items: str) -> int:
+        """Append items, return the new length."""
+        return self.client.rpush(self.key, *items)
+
+    def pop(self, count: int) -> list[str]:
+        # LPOP with a count is atomic, concurrent consumers never get the same item
+        return [item.decode() for item in self.client.lpop(self.key, count) or []]
+
+    def size(self) -> int:
+        return self.client.llen(self.key)
+
+
+class LocalListBuffer:
+    """Process-local stand-in for RedisListBuffer, when celery runs tasks eagerly without Redis."""
+
+    _buffers = {}
+    _lock = threading.Lock()
+
+    def __init__(self, name: str):
+        with self._lock:
+            self.items = self._buffers.setdefault(name, deque())
+
+    def push(self, *items: str) -> int:
+        with self._lock:
+            self.items.extend(items)
+            return len(self.items)
+
+    def pop(self, count: int) -> list[str]:
+        with self._lock:
+            return [self.items.popleft() for _ in range(min(count, len(self.items)))]
+
+    def size(self) -> int:
+        return len(self.items)
+
+
+def get_hash_buffer(name: str):
+    """Redis hash when the default cache is Redis, a process-local dict when tasks run eagerly, None otherwise.
+
+    A process-local buffer filled by web processes is never seen by a worker draining its own,
+    so without one callers write through instead of buffering.
+    """
+    if _is_redis_cache():
+        return RedisHashBuffer(name)
+    return LocalHashBuffer(name) if settings.CELERY_TASK_ALWAYS_EAGER else None
+
+
+def get_list_buffer(name: str):
+    """Redis list when the default cache is Redis, a process-local deque when tasks run eagerly, None otherwise."""
+    if _is_redis_cache():
+        return RedisListBuffer(name)
+    return LocalListBuffer(name) if settings.CELERY_TASK_ALWAYS_EAGER else None
+
+
+def _is_redis_cache():
+    return isinstance(caches['default'], RedisCache)
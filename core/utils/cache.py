@@ -0,0 +1,127 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends import db, redis
+from django.db import transaction
+
+from core.utils.profiling import record_cache
+
+_missing = object()
+
+
+class CacheStatsMixin:
+    """Count hits and misses for the sampled request, see `core.utils.profiling`."""
+
+    def get_many(self, keys, version=None):
+        values = super().get_many(keys, version=version)
+        record_cache(hits=len(values), misses=len(keys) - len(values))
+        return values
+
+
+class RedisCache(CacheStatsMixin, redis.RedisCache):
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _missing, version=version)
+        if value is _missing:
+            record_cache(hits=0, misses=1)
+            return default
+        record_cache(hits=1, misses=0)
+        return value
+
+
+class DatabaseCache(CacheStatsMixin, db.DatabaseCache):
+    # DatabaseCache.get goes through get_many
+    pass
+
+
+class LocalCache:
+    """Thread-safe per-process LRU with TTL."""
+
+    def __init__(self, max_size: int, timeout: float):
+        self.max_size = max_size
+        self.timeout = timeout
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key, _missing)
+            if item is _missing:
+                return _missing
+            value, expires = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return _missing
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.timeout)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class ReadThroughCache:
+    """Two-tier cache for API reads: per-process LRU in front of the shared Django cache.
+
+    Keys embed a version token kept in the shared cache. Writes replace the token, so both
+    tiers miss right away and stale entries simply expire. Values must be immutable and not None.
+
+    Usage::
+        key = f'users:detail:{pk}:{read_cache.get_version(f"users:{pk}")}'
+        data = read_cache.get(key)
+    """
+
+    version_timeout = None  # Version tokens never expire, an evicted token only costs a miss
+
+    def __init__(self):
+        self.local = LocalCache(max_size=settings.API_CACHE_LOCAL_SIZE, timeout=settings.API_CACHE_LOCAL_TIMEOUT)
+
+    @property
+    def enabled(self):
+        return settings.API_CACHE_ENABLED
+
+    def get_version(self, namespace: str):
+        key = f'version:{namespace}'
+        version = cache.get(key)
+        if version is None:
+            cache.add(key, uuid.uuid4().hex, self.version_timeout)
+            version = cache.get(key)
+        return version
+
+    def bump_version(self, *namespaces: str):
+        cache.set_many({f'version:{namespace}': uuid.uuid4().hex for namespace in namespaces}, self.version_timeout)
+
+    def get(self, key: str):
+        value = self.local.get(key)
+        if value is not _missing:
+            record_cache(hits=1, misses=0)
+            return value
+        value = cache.get(key)
+        if value is not None:
+            self.local.set(key, value)
+        return value
+
+    def set(self, key: str, value, timeout: int | None = None):
+        cache.set(key, value, settings.API_CACHE_TIMEOUT if timeout is None else timeout)
+        self.local.set(key, value)
+
+
+read_cache = ReadThroughCache()
+
+
+def invalidate_read_cache(namespace: str, pk=None):
+    """Drop cached lists of `namespace` and the detail of `pk`, now and once the transaction commits."""
+    namespaces = [namespace] if pk is None else [namespace, f'{namespace}:{pk}']
+    read_cache.bump_version(*namespaces)
+    # A concurrent read could cache pre-commit data under the new version, bump again after commit
+    transaction.on_commit(lambda: read_cache.bump_version(*namespaces))
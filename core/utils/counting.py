@@ -0,0 +1,62 @@
+import enum
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.db import connections
+
+
+class CountStrategy(enum.StrEnum):
+    EXACT = 'exact'
+    CACHED = 'cached'
+    ESTIMATED = 'estimated'
+
+
+def exact_count(queryset):
+    return queryset.count()
+
+
+def cached_count(queryset, timeout: int):
+    """Exact count shared between processes through the Django cache for `timeout` seconds."""
+    key = get_count_cache_key(queryset)
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, timeout)
+    return count
+
+
+def estimated_count(queryset, threshold: int):
+    """Planner estimate on Postgres when it reaches `threshold`, exact count otherwise."""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+    estimate = _get_planner_estimate(queryset, connection)
+    if estimate is None or estimate < threshold:
+        return queryset.count()
+    return estimate
+
+
+def get_count_cache_key(queryset):
+    # Compiled SQL is the normalized filter signature: query param order and defaults don't matter
+    sql, params = queryset.order_by().query.sql_with_params()
+    signature = hashlib.md5(f'{sql}|{params!r}'.encode(), usedforsecurity=False).hexdigest()
+    return f'count:{queryset.model._meta.label_lower}:{signature}'
+
+
+def _get_planner_estimate(queryset, connection):
+    query = queryset.order_by().query
+    with connection.cursor() as cursor:
+        if not query.where and not query.distinct and not query.is_sliced:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [query.model._meta.db_table]
+            )
+            row = cursor.fetchone()
+            # reltuples is -1 for tables that were never vacuumed or analyzed
+            return row[0] if row and row[0] >= 0 else None
+        sql, params = query.sql_with_params()
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
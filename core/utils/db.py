@@ -0,0 +1,104 @@
+import os
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Connections and pools a forked child got from its parent. They stay referenced so their finalizers never
+# run in the child: closing them would send a Terminate message over sockets the parent is still using.
+_inherited = []
+
+
+def forget_inherited_connections():
+    """Make a forked child open its own database connections and pools, leaving the parent's ones untouched.
+
+    Registered with `os.register_at_fork`, so it runs before Celery's worker_process_init handlers,
+    gunicorn's post_fork and ProcessPoolExecutor workers touch the database.
+    """
+    for connection in connections.all(initialized_only=True):
+        if connection.connection is not None:
+            _inherited.append(connection.connection)
+            connection.connection = None
+        pools = getattr(type(connection), '_connection_pools', None)  # psycopg pools on postgresql
+        if pools:
+            _inherited.extend(pools.values())
+            pools.clear()
+
+
+os.register_at_fork(after_in_child=forget_inherited_connections)
+
+
+# Per-request routing state set by PrimaryStickinessMiddleware, None outside requests
+_request_state = ContextVar('db_request_state', default=None)
+_primary_pinned = ContextVar('db_primary_pinned', default=False)
+
+# Tables that must never be read from a lagging replica: DatabaseCache holds read_cache version tokens
+PRIMARY_ONLY_APPS = {'django_cache'}
+
+
+def get_replicas():
+    return [alias for alias in settings.DATABASES if alias != DEFAULT_DB_ALIAS]
+
+
+class RequestState:
+    __slots__ = ('sticky', 'written')
+
+    def __init__(self, sticky=False):
+        self.sticky = sticky  # The client wrote within the sticky window
+        self.written = False  # This request wrote
+
+
+def begin_request(sticky=False):
+    return _request_state.set(RequestState(sticky))
+
+
+def end_request(token):
+    state = _request_state.get()
+    _request_state.reset(token)
+    return state
+
+
+@contextmanager
+def use_primary():
+    """Read from the primary inside the block or decorated function, e.g. before a write that depends on the read.
+
+    Routing happens when a query runs: querysets returned from the block and evaluated later need `.using()`.
+    """
+    token = _primary_pinned.set(True)
+    try:
+        yield
+    finally:
+        _primary_pinned.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """Send writes to the primary and reads to a random replica (SQL_REPLICA_HOSTS).
+
+    Reads stay on the primary inside transactions, under `use_primary` and for the rest of a request
+    that wrote, or of a client's requests within SQL_REPLICA_STICKY_SECONDS of its last write.
+    """
+
+    def __init__(self):
+        self.replicas = get_replicas()
+
+    def db_for_read(self, model, **hints):
+        if not self.replicas or model._meta.app_label in PRIMARY_ONLY_APPS or _primary_pinned.get():
+            return DEFAULT_DB_ALIAS
+        state = _request_state.get()
+        if (state is not None and (state.sticky or state.written)) or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(self.replicas)  # nosec B311 load spreading only
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None and model._meta.app_label not in PRIMARY_ONLY_APPS:
+            state.written = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # Replicas hold the same data as the primary
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
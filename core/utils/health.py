@@ -0,0 +1,75 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.http import JsonResponse
+
+from core.utils.logger import Logg
+
+_lock = threading.Lock()
+_result = None  # (checked_at, checks) of the last readiness check in this process
+
+
+def check_database():
+    for connection in connections.all():
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+
+def check_cache():
+    cache.get('health:ready')
+
+
+def check_broker():
+    # A bare kombu connection, loading the celery app would import it and every task module into web processes
+    from kombu import Connection
+
+    with Connection(settings.CELERY_BROKER_URL, connect_timeout=settings.HEALTH_CHECK_TIMEOUT) as connection:
+        connection.ensure_connection(max_retries=1, timeout=settings.HEALTH_CHECK_TIMEOUT)
+
+
+def get_checks():
+    checks = {'database': check_database, 'cache': check_cache}
+    if settings.CELERY_BROKER_URL:
+        checks['broker'] = check_broker
+    return checks
+
+
+def run_checks():
+    """Run every dependency check and return `{name: ok}`."""
+    results = {}
+    for name, check in get_checks().items():
+        try:
+            check()
+            results[name] = True
+        except Exception as exc:
+            # Every dependency fails with its own exceptions, a failing check must not fail the probe
+            Logg.warning(e='health.ready', msg='dependency check failed', check=name, error=repr(exc))
+            results[name] = False
+    return results
+
+
+def get_readiness():
+    """Dependency checks, reused for HEALTH_CHECK_CACHE_SECONDS so probes don't add load to the dependencies.
+
+    Concurrent probes of an expired result wait for one check instead of running their own.
+    """
+    global _result
+    with _lock:
+        if _result is None or time.monotonic() - _result[0] >= settings.HEALTH_CHECK_CACHE_SECONDS:
+            _result = (time.monotonic(), run_checks())
+        return _result[1]
+
+
+def live(request):
+    """The process serves requests, no dependency is checked."""
+    return JsonResponse(data={'success': True})
+
+
+def ready(request):
+    """The process and its database, cache and broker can serve requests, 503 otherwise."""
+    checks = get_readiness()
+    success = all(checks.values())
+    return JsonResponse(data={'success': success, 'checks': checks}, status=200 if success else 503)
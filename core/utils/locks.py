@@ -0,0 +1,59 @@
+import uuid
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.redis import RedisCache
+from redis.exceptions import RedisError
+from redis.lock import Lock
+
+
+class RedisLease:
+    """Expiring lock in Redis, renewed by its holder. Acquire and renew are atomic (redis-py Lock)."""
+
+    def __init__(self, name: str, timeout: float):
+        client = cache._cache.get_client(write=True)
+        self.lock = Lock(client, cache.make_key(f'lock:{name}'), timeout=timeout, thread_local=False)
+
+    def acquire(self) -> bool:
+        try:
+            return self.lock.acquire(blocking=False)
+        except RedisError:
+            return False
+
+    def renew(self) -> bool:
+        """Reset the expiry if still held, False once another holder took over."""
+        try:
+            return self.lock.reacquire()
+        except RedisError:  # LockNotOwnedError and connection errors both mean the lease is gone
+            return False
+
+    def release(self):
+        try:
+            self.lock.release()
+        except RedisError:  # Already expired or taken over
+            return
+
+
+class CacheLease:
+    """Stand-in for RedisLease on other Django cache backends. Renewal is check-then-touch, not atomic."""
+
+    def __init__(self, name: str, timeout: float):
+        self.key = f'lock:{name}'
+        self.timeout = timeout
+        self.token = uuid.uuid4().hex
+
+    def acquire(self) -> bool:
+        return cache.add(self.key, self.token, self.timeout)
+
+    def renew(self) -> bool:
+        return cache.get(self.key) == self.token and cache.touch(self.key, self.timeout)
+
+    def release(self):
+        if cache.get(self.key) == self.token:
+            cache.delete(self.key)
+
+
+def get_lease(name: str, timeout: float):
+    """Redis lease when the default cache is Redis, a cache-based one otherwise."""
+    if isinstance(caches['default'], RedisCache):
+        return RedisLease(name, timeout)
+    return CacheLease(name, timeout)
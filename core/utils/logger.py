@@ -1,18 +1,13 @@
-import inspect
+import functools
 import json
 import logging
+import os
+import queue
 import sys
+import threading
+import time
 from pathlib import Path
 
-from celery.app.trace import (
-    LOG_FAILURE,
-    LOG_IGNORED,
-    LOG_INTERNAL_ERROR,
-    LOG_RECEIVED,
-    LOG_REJECTED,
-    LOG_RETRY,
-    LOG_SUCCESS,
-)
 from loguru import logger
 
 CRITICAL = 'CRITICAL'
@@ -21,6 +16,13 @@ WARNING = 'WARNING'
 INFO = 'INFO'
 DEBUG = 'DEBUG'
 
+OVERFLOW_DROP = 'drop'
+OVERFLOW_BLOCK = 'block'
+
+_queue_sink = None
+_level_numbers = {level: logger.level(level).no for level in (CRITICAL, ERROR, WARNING, INFO, DEBUG)}
+_min_level_no = _level_numbers[DEBUG]
+
 
 class Logg:
     """Class for logging events in JSON format.
@@ -56,6 +58,8 @@ class Logg:
 
     @staticmethod
     def _log(level: str, *args, **kwargs):
+        if _level_numbers[level] < _min_level_no:
+            return
         message = Logg._serialize_message(*args, **kwargs)
         logger.opt(depth=2).log(level, message)
 
@@ -73,6 +77,101 @@ class Logg:
         return json.dumps(data, default=str, ensure_ascii=False)
 
 
+class QueueSink:
+    """Loguru sink that hands formatted records to a bounded queue, a background thread writes them in batches.
+
+    Arguments::
+        overflow : `drop` counts and reports records that don't fit the queue, `block` waits for free space
+
+    Usage::
+        logger.add(QueueSink(sys.stdout, queue_size=10000, batch_size=100, overflow='drop'))
+    """
+
+    _stop_marker = object()
+
+    def __init__(self, stream, queue_size: int = 10000, batch_size: int = 100, overflow: str = OVERFLOW_DROP):
+        if overflow not in (OVERFLOW_DROP, OVERFLOW_BLOCK):
+            raise ValueError(f'Unknown log queue overflow policy: {overflow}')
+        self.stream = stream
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.overflow = overflow
+        self._stopped = False
+        self._start()
+        # The writer thread doesn't survive fork (gunicorn --preload, celery prefork), restart it in children
+        os.register_at_fork(after_in_child=self._start)
+
+    def _start(self):
+        if self._stopped:
+            return
+        self.queue = queue.Queue(maxsize=self.queue_size)
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='log-queue-sink', daemon=True)
+        self._thread.start()
+
+    def write(self, message):
+        if self.overflow == OVERFLOW_BLOCK:
+            self.queue.put(message)
+            return
+        try:
+            self.queue.put_nowait(message)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+    def isatty(self):
+        return self.stream.isatty()
+
+    def drain(self, timeout: float = 5.0):
+        """Wait until queued records are written, call before the process exits without atexit hooks."""
+        deadline = time.monotonic() + timeout
+        while self.queue.unfinished_tasks and self._thread.is_alive() and time.monotonic() < deadline:
+            time.sleep(0.005)
+
+    def stop(self):
+        # Called by logger.remove(), loguru runs it at exit, so pending records are flushed on shutdown
+        if self._stopped:
+            return
+        self._stopped = True
+        self.queue.put(self._stop_marker)
+        self._thread.join(timeout=5.0)
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = self._stop_marker in batch
+            self._write_batch([message for message in batch if message is not self._stop_marker])
+            for _ in batch:
+                self.queue.task_done()
+            if stop:
+                return
+
+    def _write_batch(self, messages: list):
+        with self._dropped_lock:
+            dropped, self.dropped = self.dropped, 0
+        if dropped:
+            messages.append(Logg._serialize_message(e='logging.dropped', count=dropped) + '\n')
+        if not messages:
+            return
+        try:
+            self.stream.write(''.join(messages))
+            self.stream.flush()
+        except (OSError, ValueError):  # Broken or closed stream, account the batch as dropped
+            with self._dropped_lock:
+                self.dropped += len(messages)
+
+
+def flush_logging():
+    if _queue_sink is not None:
+        _queue_sink.drain()
+
+
 def init_logging(log_dir: Path, debug: bool, *args, **kwargs):
     _init_logger(log_dir, debug, *args, **kwargs)
     return {
@@ -112,8 +211,20 @@ def init_logging(log_dir: Path, debug: bool, *args, **kwargs):
     }
 
 
-def _init_logger(log_dir: Path, debug: bool, *args, **kwargs):
+def _init_logger(
+    log_dir: Path,
+    debug: bool,
+    *args,
+    queue_enabled: bool = False,
+    queue_size: int = 10000,
+    queue_batch_size: int = 100,
+    queue_overflow: str = OVERFLOW_DROP,
+    level: str = DEBUG,
+    **kwargs,
+):
+    global _queue_sink, _min_level_no
     sys.excepthook = _log_exceptions
+    _min_level_no = _level_numbers[level]
 
     format_values = [
         '<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green>',
@@ -121,11 +232,14 @@ def _init_logger(log_dir: Path, debug: bool, *args, **kwargs):
         '{message}',
         '<cyan>{name}<red>:</red>{function}<red>:</red>{line}</cyan>',
     ]
-    params = {'format': ' <red>|</red> '.join(format_values), 'backtrace': False, 'diagnose': False}
+    params = {'format': ' <red>|</red> '.join(format_values), 'level': level, 'backtrace': False, 'diagnose': False}
 
     logger.remove()
+    _queue_sink = None
+    if queue_enabled:  # Don't block request threads on stdout back-pressure
+        _queue_sink = QueueSink(sys.stdout, queue_size=queue_size, batch_size=queue_batch_size, overflow=queue_overflow)
     logger.add(
-        sys.stdout,
+        _queue_sink or sys.stdout,
         **params,
     )
     if debug:  # Disabled write log to files in production mode
@@ -144,6 +258,8 @@ def _log_exceptions(exc_type, exc_value, exc_traceback):
 
 class LoguruHandler(logging.Handler):
     def emit(self, record):
+        if record.levelno < _min_level_no:
+            return
         try:
             level = logger.level(record.levelname).name
         except ValueError:
@@ -154,9 +270,12 @@ class LoguruHandler(logging.Handler):
 
     @staticmethod
     def _get_depth(record: logging.LogRecord):
-        for depth, frame in enumerate(inspect.stack()):
-            if record.pathname == frame.filename:
-                return depth - 1
+        # Walk raw frames instead of inspect.stack(), which reads source lines for the whole stack
+        frame, depth = sys._getframe(1), 0
+        while frame is not None:
+            if frame.f_code.co_filename == record.pathname:
+                return depth
+            frame, depth = frame.f_back, depth + 1
         return 2
 
     @staticmethod
@@ -166,19 +285,10 @@ class LoguruHandler(logging.Handler):
 
         if not hasattr(record, 'data'):
             return Logg._serialize_message(e='celery.trace', msg=record.getMessage())
-        celery_log_types = {
-            LOG_RECEIVED: 'received',
-            LOG_SUCCESS: 'success',
-            LOG_FAILURE: 'failure',
-            LOG_INTERNAL_ERROR: 'internal_error',
-            LOG_IGNORED: 'ignored',
-            LOG_REJECTED: 'rejected',
-            LOG_RETRY: 'retry',
-        }
         data = getattr(record, 'data') or {}
         return Logg._serialize_message(
             e='celery.task',
-            type=celery_log_types.get(record.msg, 'unhandled'),
+            type=_get_celery_log_types().get(record.msg, 'unhandled'),
             task=str(data.get('name')),
             task_id=data.get('id'),
             args=data.get('args'),
@@ -186,3 +296,19 @@ class LoguruHandler(logging.Handler):
             runtime=f'{round(data["runtime"], 3)}s' if data.get('runtime') else None,
             return_value=data.get('return_value'),
         )
+
+
+@functools.cache
+def _get_celery_log_types():
+    # Imported on the first celery record: settings load this module in processes that never run celery
+    from celery.app import trace
+
+    return {
+        trace.LOG_RECEIVED: 'received',
+        trace.LOG_SUCCESS: 'success',
+        trace.LOG_FAILURE: 'failure',
+        trace.LOG_INTERNAL_ERROR: 'internal_error',
+        trace.LOG_IGNORED: 'ignored',
+        trace.LOG_REJECTED: 'rejected',
+        trace.LOG_RETRY: 'retry',
+    }
@@ -0,0 +1,53 @@
+import os
+import resource
+import sys
+import threading
+
+_page_size = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def get_rss() -> int:
+    """Resident set size of this process in bytes: current on Linux, the peak elsewhere."""
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * _page_size
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024  # bytes on macOS, KiB on Linux and BSD
+
+
+class RssRecycler:
+    """Calls `on_recycle(rss, baseline)` once the process RSS grew by `max_growth` bytes since `start`.
+
+    A daemon thread samples RSS every `interval` seconds, so growth is measured instead of guessed from
+    a request count. `on_recycle` is expected to stop the process gracefully.
+
+    Usage::
+        RssRecycler(max_growth=256 * 2**20, interval=10, on_recycle=lambda rss, baseline: ...).start()
+    """
+
+    def __init__(self, max_growth: int, interval: float, on_recycle):
+        self.max_growth = max_growth
+        self.interval = interval
+        self.on_recycle = on_recycle
+        self.baseline = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        self.baseline = get_rss()
+        threading.Thread(target=self._run, name='rss-recycler', daemon=True).start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def check(self) -> bool:
+        rss = get_rss()
+        if rss - self.baseline < self.max_growth:
+            return False
+        self.on_recycle(rss, self.baseline)
+        return True
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            if self.check():
+                return
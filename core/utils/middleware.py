@@ -0,0 +1,157 @@
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from core.utils.db import begin_request, end_request, get_replicas
+from core.utils.logger import Logg
+from core.utils.profiling import RequestProfile, activate_profile, deactivate_profile, install_query_profiler
+
+
+class PerformanceMiddleware:
+    """Measure wall, DB, cache and render time of sampled requests.
+
+    Emits one `http.request` event per sampled request (warning when it's slower than
+    PERFORMANCE_SLOW_REQUEST_MS) and optionally a Server-Timing header. Requests that are
+    not sampled only get a wall-time check against the slow threshold, or nothing at all.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = settings.PERFORMANCE_SAMPLE_RATE
+        self.slow_request_ms = settings.PERFORMANCE_SLOW_REQUEST_MS
+        self.server_timing = settings.PERFORMANCE_SERVER_TIMING
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self._is_sampled():
+            if not self.slow_request_ms:
+                return self.get_response(request)
+            started = time.perf_counter()
+            response = self.get_response(request)
+            self._log_slow(request, response, started)
+            return response
+
+        profile = RequestProfile()
+        token = activate_profile(profile)
+        try:
+            for connection in connections.all(initialized_only=True):
+                install_query_profiler(connection)
+            response = self.get_response(request)
+        finally:
+            deactivate_profile(token)
+        return self._finish(request, response, profile)
+
+    async def __acall__(self, request):
+        if not self._is_sampled():
+            if not self.slow_request_ms:
+                return await self.get_response(request)
+            started = time.perf_counter()
+            response = await self.get_response(request)
+            self._log_slow(request, response, started)
+            return response
+
+        profile = RequestProfile()
+        token = activate_profile(profile)
+        try:
+            response = await self.get_response(request)
+        finally:
+            deactivate_profile(token)
+        return self._finish(request, response, profile)
+
+    def _is_sampled(self):
+        return self.sample_rate > 0 and random.random() < self.sample_rate  # nosec B311 sampling only
+
+    def _log_slow(self, request, response, started):
+        duration_ms = (time.perf_counter() - started) * 1000
+        if duration_ms >= self.slow_request_ms:
+            Logg.warning(e='http.request', **self._get_request_data(request, response, duration_ms), slow=True)
+
+    def _finish(self, request, response, profile: RequestProfile):
+        duration_ms = (time.perf_counter() - profile.started) * 1000
+        timings = {
+            'db': profile.db_time * 1000,
+            'render': profile.render_time * 1000,
+            'app': duration_ms - (profile.db_time + profile.render_time) * 1000,
+            'total': duration_ms,
+        }
+        if self.server_timing:
+            response['Server-Timing'] = ', '.join(
+                [f'{name};dur={value:.1f}' for name, value in timings.items()]
+                + [f'cache;desc="hits={profile.cache_hits} misses={profile.cache_misses}"']
+            )
+
+        slow = bool(self.slow_request_ms) and duration_ms >= self.slow_request_ms
+        (Logg.warning if slow else Logg.info)(
+            e='http.request',
+            **self._get_request_data(request, response, duration_ms),
+            db_queries=profile.db_queries,
+            db_ms=round(timings['db'], 2),
+            render_ms=round(timings['render'], 2),
+            app_ms=round(timings['app'], 2),
+            cache_hits=profile.cache_hits,
+            cache_misses=profile.cache_misses,
+            slow=slow,
+        )
+        return response
+
+    @staticmethod
+    def _get_request_data(request, response, duration_ms):
+        return {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round(duration_ms, 2),
+        }
+
+
+class PrimaryStickinessMiddleware:
+    """Route a client's reads to the primary for SQL_REPLICA_STICKY_SECONDS after it writes.
+
+    The window is carried by a cookie so it covers the client's next requests, which could otherwise
+    read a replica that hasn't applied the write yet. Not used without replicas.
+    """
+
+    sync_capable = True
+    async_capable = True
+    cookie_name = 'db_primary'
+
+    def __init__(self, get_response):
+        if not get_replicas():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sticky_seconds = settings.SQL_REPLICA_STICKY_SECONDS
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = begin_request(sticky=self.cookie_name in request.COOKIES)
+        try:
+            response = self.get_response(request)
+        finally:
+            state = end_request(token)
+        return self._finish(response, state)
+
+    async def __acall__(self, request):
+        token = begin_request(sticky=self.cookie_name in request.COOKIES)
+        try:
+            response = await self.get_response(request)
+        finally:
+            state = end_request(token)
+        return self._finish(response, state)
+
+    def _finish(self, response, state):
+        if state.written:
+            response.set_cookie(self.cookie_name, '1', max_age=self.sticky_seconds, httponly=True, samesite='Lax')
+        return response
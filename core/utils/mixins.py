@@ -0,0 +1,194 @@
+import hashlib
+import weakref
+from urllib.parse import urlencode
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.http import HttpResponse
+from rest_framework import exceptions
+from rest_framework.response import Response
+
+from core.utils.cache import read_cache
+from core.utils.renderers import JSONRenderer
+from core.utils.serializers import ReadLayout, sparse_serializer
+
+
+class CachedReadMixin:
+    """Serve `list` and `retrieve` of a viewset from `read_cache` as rendered JSON.
+
+    Set `cache_namespace` and call `invalidate_read_cache(namespace, pk)` when a row changes.
+    Lists are keyed by the namespace version and query params, details by the row version.
+    """
+
+    cache_namespace = None
+
+    def list(self, request, *args, **kwargs):
+        return self.cached(
+            self.get_list_cache_key(request), lambda: super(CachedReadMixin, self).list(request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        key = self.get_detail_cache_key(request, self.kwargs[self.lookup_url_kwarg or self.lookup_field])
+        return self.cached(key, lambda: super(CachedReadMixin, self).retrieve(request, *args, **kwargs))
+
+    def cached(self, key, build):
+        response = self.get_cached_response(key)
+        if response is None:
+            response = self.cache_response(key, build())
+        return response
+
+    async def acached(self, key, abuild):
+        response = await sync_to_async(self.get_cached_response)(key)
+        if response is None:
+            response = await sync_to_async(self.cache_response)(key, await abuild())
+        return response
+
+    def get_list_cache_key(self, request):
+        if not read_cache.enabled or not self.cache_namespace:
+            return None
+        version = read_cache.get_version(self.cache_namespace)
+        return f'api:{self.cache_namespace}:list:{version}:{self._get_params_signature(request)}'
+
+    def get_detail_cache_key(self, request, pk):
+        if not read_cache.enabled or not self.cache_namespace:
+            return None
+        try:  # Keys must match the pk used by invalidation, `05` and `5` are the same row
+            pk = self.get_queryset().model._meta.pk.to_python(pk)
+        except ValidationError:
+            return None
+        version = read_cache.get_version(f'{self.cache_namespace}:{pk}')
+        return f'api:{self.cache_namespace}:detail:{pk}:{version}:{self._get_params_signature(request)}'
+
+    @staticmethod
+    def get_cached_response(key):
+        if key is None:
+            return None
+        content = read_cache.get(key)
+        if content is None:
+            return None
+        return HttpResponse(content, content_type='application/json')
+
+    @staticmethod
+    def cache_response(key, response):
+        # Streaming, error and not yet cacheable responses pass through untouched
+        if key is None or not isinstance(response, Response) or response.status_code != 200:
+            return response
+        content = JSONRenderer().render(response.data)
+        read_cache.set(key, content)
+        return HttpResponse(content, content_type='application/json')
+
+    @staticmethod
+    def _get_params_signature(request):
+        params = urlencode(sorted(request.query_params.lists()), doseq=True)
+        return hashlib.md5(params.encode(), usedforsecurity=False).hexdigest()
+
+
+class ValuesReadMixin:
+    """Serve read actions from `values()` rows through a `ReadLayout` compiled once per serializer and action.
+
+    Rows skip model instantiation and the serializer's per-object field machinery, the output is
+    the serializer's own. Serializers with fields that aren't plain model columns keep the regular path.
+    Only `values_actions` fetch rows, detail actions represent the instance from `get_object()` so
+    object permission checks still receive a model instance.
+    """
+
+    read_layout_actions = ('list', 'retrieve', 'me')
+    values_actions = ('list',)
+    _read_layouts = weakref.WeakKeyDictionary()  # Sparse fieldset serializers come and go
+
+    def get_read_layout(self):
+        if self.action not in self.read_layout_actions:
+            return None
+        serializer_class = self.get_serializer_class()
+        layouts = self._read_layouts.setdefault(serializer_class, {})
+        if self.action not in layouts:
+            layouts[self.action] = ReadLayout.compile(serializer_class(context=self.get_serializer_context()))
+        return layouts[self.action]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        layout = self.get_read_layout()
+        if layout is None or self.action not in self.values_actions:
+            return queryset
+        return queryset.values(*layout.columns)
+
+    def get_serializer(self, *args, **kwargs):
+        layout = self.get_read_layout()
+        if layout is None:
+            return super().get_serializer(*args, **kwargs)
+        return layout.bind(*args, **kwargs)
+
+
+class SparseFieldsMixin:
+    """Narrow read actions to `?fields=id,email`: other fields leave the serializer and their columns the query.
+
+    Requested fields backed by model columns load with `.only()`, or select only those columns in the
+    values() rows of ValuesReadMixin when placed after it. Unknown names are a 400.
+    """
+
+    sparse_fields_param = 'fields'
+    sparse_fields_actions = ('list', 'retrieve')
+    _field_columns = {}
+
+    def get_sparse_fields(self):
+        """Requested field names in serializer order, None when all are returned."""
+        if not hasattr(self, '_sparse_fields'):
+            self._sparse_fields = self._parse_sparse_fields()
+        return self._sparse_fields
+
+    def get_field_columns(self):
+        """Readable fields of the serializer mapped to their model column, None for computed ones."""
+        serializer_class = super().get_serializer_class()
+        key = (serializer_class, self.action)
+        if key not in self._field_columns:
+            serializer = serializer_class(context=self.get_serializer_context())
+            model = serializer.Meta.model
+            columns = {}
+            for name, field in serializer.fields.items():
+                if field.write_only:
+                    continue
+                try:
+                    model_field = model._meta.get_field(field.source) if len(field.source_attrs) == 1 else None
+                except FieldDoesNotExist:
+                    model_field = None
+                columns[name] = model_field.name if model_field is not None and model_field.concrete else None
+            self._field_columns[key] = columns
+        return self._field_columns[key]
+
+    def get_serializer_class(self):
+        serializer_class = super().get_serializer_class()
+        fields = self.get_sparse_fields()
+        return serializer_class if fields is None else sparse_serializer(serializer_class, fields)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.get_sparse_fields()
+        if fields is None or queryset.query.values_select:  # values() rows already select the serializer's columns
+            return queryset
+        columns = self.get_field_columns()
+        if any(columns[name] is None for name in fields):  # Computed fields may read any column
+            return queryset
+        return queryset.only(*(columns[name] for name in fields))
+
+    def _parse_sparse_fields(self):
+        if self.action not in self.sparse_fields_actions:
+            return None
+        value = self.request.query_params.get(self.sparse_fields_param)
+        if not value:
+            return None
+        requested = {name.strip() for name in value.split(',')} - {''}
+        if not requested:  # `?fields=,` selects nothing, treated like no fieldset rather than empty objects
+            return None
+        columns = self.get_field_columns()
+        unknown = requested - columns.keys()
+        if unknown:
+            raise exceptions.ValidationError(
+                {
+                    self.sparse_fields_param: [
+                        f'Unknown fields: {", ".join(sorted(unknown))}. Expected any of: {", ".join(columns)}.'
+                    ]
+                }
+            )
+        if requested == columns.keys():
+            return None
+        return tuple(name for name in columns if name in requested)
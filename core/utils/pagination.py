@@ -1,34 +1,84 @@
+import base64
+import binascii
+import itertools
+import json
 from collections import OrderedDict
+from functools import partial
 
-from django.core.paginator import InvalidPage
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import InvalidPage, Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from django.utils.functional import cached_property
 from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 
+from core.utils.counting import CountStrategy, cached_count, estimated_count, exact_count
+from core.utils.export import aiterate
+
+
+class CountPaginator(Paginator):
+    def __init__(self, object_list, per_page, count_function=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_function = count_function
+
+    @cached_property
+    def count(self):
+        if self.count_function is None:
+            return super().count
+        return self.count_function(self.object_list)
+
+    def page(self, number):
+        # Don't clamp the slice to `count`, a cached or estimated total may lag behind the table
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        return self._get_page(self.object_list[bottom : bottom + self.per_page], number, self)
+
 
 class BasePagination(PageNumberPagination):
+    django_paginator_class = CountPaginator
     page_size = 20
     max_page_size = 100
     all_items_string = 'all'
     page_query_param = 'page'
     page_size_query_param = 'page_size'
+    # Keyset mode is enabled by `pagination_mode = 'keyset'` on the view, `?pagination=keyset` or `?cursor=`
+    keyset_mode = 'keyset'
+    mode_query_param = 'pagination'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+    # `page_size=all` is streamed in chunks instead of being loaded and rendered at once
+    stream_chunk_size = 500
+    # How `total` is computed, views can override it with `pagination_count_strategy`
+    count_strategy = CountStrategy.EXACT
+    count_cache_timeout = 30
+    count_estimate_threshold = 100_000
 
     def paginate_queryset(self, queryset, request, view=None):
         """
         Paginate a queryset if required, either returning a
         page object, or `None` if pagination is not configured for this view.
         """
-        page_size = self.get_page_size(request)
-        if page_size == self.all_items_string:
-            page_size = len(queryset)
-            if page_size < 1:
-                page_size = self.page_size
+        self.keyset = False
+        self.stream = False
 
         # Auto set order_by for correct pagination if not provided
         if not queryset.query.order_by and not queryset.model._meta.ordering:
             queryset.query.order_by = ('pk',)
 
-        paginator = self.django_paginator_class(queryset, page_size)
+        if self.is_keyset_mode(request, view):
+            ordering = self.get_keyset_ordering(queryset)
+            if ordering is not None:
+                return self.paginate_keyset(queryset, request, ordering)
+
+        page_size = self.get_page_size(request)
+        if page_size == self.all_items_string:
+            return self.paginate_stream(queryset, request, view)
+
+        paginator = self.django_paginator_class(queryset, page_size, count_function=self.get_count_function(view))
         page_number = request.query_params.get(self.page_query_param, 1)
         if page_number in self.last_page_strings:
             page_number = paginator.num_pages
@@ -47,6 +97,22 @@ class BasePagination(PageNumberPagination):
         return self.page.object_list
 
     def get_paginated_response(self, data):
+        if self.stream:
+            content = self.stream_content()
+            if getattr(self.view, 'view_is_async', False):
+                content = aiterate(content)
+            return StreamingHttpResponse(content, content_type='application/json')
+        if self.keyset:
+            return Response(
+                OrderedDict(
+                    [
+                        ('next', self.next_cursor),
+                        ('previous', self.previous_cursor),
+                        ('page_size', self.keyset_page_size),
+                        ('results', data),
+                    ]
+                )
+            )
         return Response(
             OrderedDict(
                 [
@@ -73,3 +139,166 @@ class BasePagination(PageNumberPagination):
         if self.max_page_size and page_size > self.max_page_size:
             return self.max_page_size
         return page_size
+
+    def get_count_function(self, view=None):
+        strategy = getattr(view, 'pagination_count_strategy', self.count_strategy)
+        if strategy == CountStrategy.CACHED:
+            return partial(cached_count, timeout=self.count_cache_timeout)
+        if strategy == CountStrategy.ESTIMATED:
+            return partial(estimated_count, threshold=self.count_estimate_threshold)
+        return exact_count
+
+    # ----------- STREAM ----------- #
+
+    def paginate_stream(self, queryset, request, view):
+        """
+        Defer `page_size=all` to `stream_content`. The view serializes an empty page,
+        rows are fetched and serialized chunk by chunk while the response is sent.
+        """
+        self.stream_queryset = queryset
+        self.stream_total = queryset.count()
+        self.view = view
+        self.stream = True
+        self.request = request
+        return []
+
+    def stream_content(self):
+        renderer = JSONRenderer()
+        envelope = OrderedDict(
+            [
+                ('total', self.stream_total),
+                ('page', 1),
+                ('page_size', self.stream_total or self.page_size),
+                ('last_page', 1),
+                ('results', []),
+            ]
+        )
+        yield renderer.render(envelope)[: -len(b']}')]
+        rows = self.stream_queryset.iterator(chunk_size=self.stream_chunk_size)
+        for index, chunk in enumerate(itertools.batched(rows, self.stream_chunk_size)):
+            data = self.view.get_serializer(chunk, many=True).data
+            yield (b',' if index else b'') + renderer.render(data)[1:-1]
+        yield b']}'
+
+    # ----------- KEYSET ----------- #
+
+    def is_keyset_mode(self, request, view=None):
+        if self.cursor_query_param in request.query_params:
+            return True
+        mode = request.query_params.get(self.mode_query_param) or getattr(view, 'pagination_mode', None)
+        return mode == self.keyset_mode
+
+    @classmethod
+    def get_keyset_ordering(cls, queryset):
+        """
+        Return the effective ordering as `[(field, descending), ...]` with `pk` as a tie-breaker,
+        or `None` if it contains expressions or nullable fields that can't be used for seeking.
+        """
+        ordering = []
+        for field in queryset.query.order_by or queryset.model._meta.ordering:
+            if not isinstance(field, str) or field == '?':
+                return None
+            # NULLs sort apart from every value and `field__gt=None` matches nothing
+            if any(model_field.null for model_field in cls._get_model_fields(queryset.model, field.lstrip('-'))):
+                return None
+            ordering.append((field.lstrip('-'), field.startswith('-')))
+        pk_names = ('pk', queryset.model._meta.pk.name)
+        if not any(field in pk_names for field, _ in ordering):
+            ordering.append(('pk', ordering[-1][1] if ordering else False))
+        return ordering
+
+    def paginate_keyset(self, queryset, request, ordering):
+        page_size = self.get_page_size(request)
+        if page_size == self.all_items_string:
+            page_size = self.max_page_size
+
+        if queryset.query.values_select:  # values() rows only carry the selected fields, cursors need the ordering
+            selected = (*queryset.query.values_select, *queryset.query.annotation_select)
+            missing = [field for field, _ in ordering if field not in selected]
+            if missing:
+                queryset = queryset.values(*selected, *missing)
+
+        cursor = self.decode_cursor(request, ordering, queryset.model)
+        reverse = bool(cursor and cursor['reverse'])
+        queryset = queryset.order_by(*[('-' if descending != reverse else '') + f for f, descending in ordering])
+        if cursor:
+            queryset = queryset.filter(self._get_seek_filter(ordering, cursor['position'], reverse))
+
+        items = list(queryset[: page_size + 1])
+        has_more = len(items) > page_size
+        items = items[:page_size]
+        if reverse:
+            items.reverse()
+
+        # Moving forward there is a previous page only if we came from one, and vice versa
+        has_next, has_previous = (True, has_more) if reverse else (has_more, cursor is not None)
+        self.next_cursor = self.encode_cursor(items[-1], ordering) if items and has_next else None
+        self.previous_cursor = self.encode_cursor(items[0], ordering, reverse=True) if items and has_previous else None
+        self.keyset_page_size = page_size
+        self.keyset = True
+        self.request = request
+        return items
+
+    def encode_cursor(self, item, ordering, reverse=False):
+        position = [self._get_position_value(item, field) for field, _ in ordering]
+        data = json.dumps({'p': position, 'r': int(reverse)}, cls=DjangoJSONEncoder, separators=(',', ':'))
+        return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request, ordering, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)))
+            position, reverse = data['p'], bool(data['r'])
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(ordering):
+            raise NotFound(self.invalid_cursor_message)
+        try:  # Tampered positions would otherwise fail inside the seek filter
+            position = [self._to_position(model, field, value) for (field, _), value in zip(ordering, position)]
+        except (ValidationError, ValueError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+        return {'position': position, 'reverse': reverse}
+
+    @classmethod
+    def _to_position(cls, model, field, value):
+        if value is None:
+            raise ValueError('Null cursor position')
+        model_fields = cls._get_model_fields(model, field)
+        if not model_fields:
+            return value  # Annotations and transforms are left to the database
+        return model_fields[-1].to_python(value)
+
+    @staticmethod
+    def _get_model_fields(model, field):
+        """Model fields along the `a__b` path of `field`, empty for annotations and transforms."""
+        model_fields = []
+        try:
+            for name in field.split('__'):
+                if model_fields:
+                    model = model_fields[-1].related_model
+                model_fields.append(model._meta.pk if name == 'pk' else model._meta.get_field(name))
+        except (FieldDoesNotExist, AttributeError):
+            return []
+        return model_fields
+
+    @staticmethod
+    def _get_position_value(item, field):
+        if isinstance(item, dict):
+            return item[field]
+        for attr in field.split('__'):
+            item = getattr(item, attr)
+        return item
+
+    @staticmethod
+    def _get_seek_filter(ordering, position, reverse):
+        """Build `(a > x) OR (a = x AND b > y) ...` for the ordering, flipped for descending fields."""
+        seek = Q()
+        for index, (field, descending) in enumerate(ordering):
+            lookup = 'lt' if descending != reverse else 'gt'
+            condition = Q(**{f'{field}__{lookup}': position[index]})
+            for prev_index, (prev_field, _) in enumerate(ordering[:index]):
+                condition &= Q(**{prev_field: position[prev_index]})
+            seek |= condition
+        return seek
@@ -0,0 +1,63 @@
+import time
+from contextvars import ContextVar
+
+from django.db.backends.signals import connection_created
+
+_current_profile = ContextVar('request_profile', default=None)
+
+
+class RequestProfile:
+    """Counters collected for a single sampled request, see `core.utils.middleware.PerformanceMiddleware`."""
+
+    __slots__ = ('cache_hits', 'cache_misses', 'db_queries', 'db_time', 'render_time', 'started')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.render_time = 0.0
+
+
+def activate_profile(profile: RequestProfile):
+    return _current_profile.set(profile)
+
+
+def deactivate_profile(token):
+    _current_profile.reset(token)
+
+
+def profile_query(execute, sql, params, many, context):
+    profile = _current_profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.db_queries += 1
+        profile.db_time += time.perf_counter() - started
+
+
+def install_query_profiler(connection, **kwargs):
+    # Installed on every connection, not per request: async views run queries in executor threads
+    # with their own connections, the context variable still points them to the request profile
+    if profile_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(profile_query)
+
+
+connection_created.connect(install_query_profiler)
+
+
+def record_cache(hits: int, misses: int):
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.cache_hits += hits
+        profile.cache_misses += misses
+
+
+def record_render(duration: float):
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.render_time += duration
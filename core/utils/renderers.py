@@ -0,0 +1,14 @@
+import time
+
+from rest_framework import renderers
+
+from core.utils.profiling import record_render
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        started = time.perf_counter()
+        try:
+            return super().render(data, accepted_media_type, renderer_context)
+        finally:
+            record_render(time.perf_counter() - started)
@@ -0,0 +1,107 @@
+import functools
+from types import SimpleNamespace
+
+from air_drf_relation.serializers import AirModelSerializer, AirSerializer
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import fields, serializers
+
+# Field types whose to_representation only depends on the value, not on the request or the instance
+VALUE_FIELDS = (
+    fields.BooleanField,
+    fields.CharField,
+    fields.ChoiceField,
+    fields.DateField,
+    fields.DateTimeField,
+    fields.DecimalField,
+    fields.DurationField,
+    fields.FloatField,
+    fields.IntegerField,
+    fields.JSONField,
+    fields.TimeField,
+    fields.UUIDField,
+)
+# Builtins returning the same as these to_representation methods for values loaded from the database
+BUILTIN_REPRESENTATIONS = {
+    fields.BooleanField.to_representation: bool,
+    fields.CharField.to_representation: str,
+    fields.IntegerField.to_representation: int,
+}
+# Serializer-level to_representation methods that only assemble field representations: the Air ones
+# prefetch relations and stringify UUIDs, which UUIDField already returns as strings
+PLAIN_REPRESENTATIONS = (
+    serializers.Serializer.to_representation,
+    AirSerializer.to_representation,
+    AirModelSerializer.to_representation,
+)
+
+
+class ReadLayout:
+    """Readable fields of a serializer compiled once, to represent `values()` rows or instances without it.
+
+    Builds the same dicts as the serializer, in the same key order, calling each field's
+    `to_representation` (or the equivalent builtin) directly instead of instantiating
+    the serializer and resolving its fields for every object.
+    """
+
+    def __init__(self, layout):
+        self.layout = layout  # [(name, model field name, to_representation)]
+        self.columns = tuple(dict.fromkeys(source for _, source, _ in layout))
+
+    @classmethod
+    def compile(cls, serializer):
+        """Layout of `serializer`, or None when a readable field isn't a plain model column or the output is customized."""
+        if type(serializer).to_representation not in PLAIN_REPRESENTATIONS:
+            return None
+        model = serializer.Meta.model
+        layout = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if not isinstance(field, VALUE_FIELDS) or len(field.source_attrs) != 1:
+                return None
+            try:
+                model_field = model._meta.get_field(field.source)
+            except FieldDoesNotExist:
+                return None  # Property or method
+            if not model_field.concrete or model_field.is_relation:
+                return None
+            represent = BUILTIN_REPRESENTATIONS.get(type(field).to_representation, field.to_representation)
+            layout.append((name, field.source, represent))
+        return cls(layout)
+
+    def to_representation(self, item):
+        if isinstance(item, dict):
+            return {
+                name: None if (value := item[source]) is None else represent(value)
+                for name, source, represent in self.layout
+            }
+        return {
+            name: None if (value := getattr(item, source)) is None else represent(value)
+            for name, source, represent in self.layout
+        }
+
+    def bind(self, instance, many=False):
+        """A read-only stand-in for `serializer(instance, many=many)` that only has `data`."""
+        if many:
+            return SimpleNamespace(data=[self.to_representation(item) for item in instance])
+        return SimpleNamespace(data=self.to_representation(instance))
+
+
+@functools.lru_cache(maxsize=256)
+def sparse_serializer(serializer_class, fields):
+    """Subclass of `serializer_class` with its readable fields narrowed to `fields`, write-only ones are kept."""
+
+    def get_fields(self):
+        return {
+            name: field
+            for name, field in super(serializer, self).get_fields().items()
+            if field.write_only or name in fields
+        }
+
+    attrs = {
+        'get_fields': get_fields,
+        '__module__': serializer_class.__module__,
+        '__qualname__': serializer_class.__qualname__,
+    }
+    serializer = type(serializer_class)(serializer_class.__name__, (serializer_class,), attrs)
+    return serializer
@@ -0,0 +1,83 @@
+"""Cold start probe, run in a fresh interpreter with `-X importtime` by `manage.py profile_startup`.
+
+Loads the WSGI or ASGI application, serves one GET request and prints a RESULT_PREFIX line with the
+wall-clock milliseconds since the parent spawned the process.
+
+Usage::
+    python -X importtime -m core.utils.startup wsgi /api/v1/live 1760000000.0
+"""
+
+import asyncio
+import json
+import sys
+import time
+from wsgiref.util import setup_testing_defaults
+
+RESULT_PREFIX = 'startup-profile:'
+
+
+def serve_wsgi(path: str):
+    from core.wsgi import application
+
+    ready_at = time.time()
+    environ = {'PATH_INFO': path, 'HTTP_HOST': 'localhost'}
+    setup_testing_defaults(environ)
+    statuses = []
+    response = application(environ, lambda status, headers, exc_info=None: statuses.append(status))
+    try:
+        b''.join(response)
+    finally:
+        response.close()
+    return ready_at, int(statuses[0].split()[0])
+
+
+def serve_asgi(path: str):
+    from core.asgi import application
+
+    ready_at = time.time()
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(b'host', b'localhost')],
+        'client': ('127.0.0.1', 0),
+        'server': ('localhost', 80),
+    }
+    messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+    statuses = []
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await asyncio.Future()  # The client never disconnects, Django cancels this once it responded
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            statuses.append(message['status'])
+
+    asyncio.run(application(scope, receive, send))
+    return ready_at, statuses[0]
+
+
+def main():
+    server, path, spawned_at = sys.argv[1], sys.argv[2], float(sys.argv[3])
+    ready_at, status = (serve_asgi if server == 'asgi' else serve_wsgi)(path)
+    responded_at = time.time()
+    result = {
+        'server': server,
+        'path': path,
+        'status': status,
+        'app_ready_ms': round((ready_at - spawned_at) * 1000, 1),
+        'first_request_ms': round((responded_at - spawned_at) * 1000, 1),
+    }
+    print(RESULT_PREFIX + json.dumps(result), flush=True)
+
+
+if __name__ == '__main__':
+    main()
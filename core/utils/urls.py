@@ -1,11 +1,13 @@
 from django.conf import settings
 from django.conf.urls.static import static
-from django.http import JsonResponse
 from django.urls import path, re_path
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
+from core.utils import health
+
 urlpatterns = [
-    re_path('api/v1/ready/?$', lambda request: JsonResponse(data={'success': True})),
+    re_path('api/v1/live/?$', health.live, name='live'),
+    re_path('api/v1/ready/?$', health.ready, name='ready'),
     path('api/v1/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/v1/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
 ]
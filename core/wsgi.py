@@ -3,6 +3,7 @@ import os
 from django.core.wsgi import get_wsgi_application
 
 from core.settings import common
+from core.utils import db  # noqa: F401 Forked workers drop inherited DB connections
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', common.SETTINGS_MODULE)
 
@@ -0,0 +1,61 @@
+from django.conf import settings
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from core.utils.cache import read_cache
+from core.utils.db import use_primary
+from user.signals import USERS_CACHE_NAMESPACE
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that resolves `request.user` from `read_cache` instead of a query per request.
+
+    Rows are cached by user id, token `iat` and the row version replaced on every User save or delete,
+    so password, is_active and is_staff changes apply to the next request. Rows are read from the
+    primary: a lagging replica would serve, and cache, a row from before a password change.
+    Secret columns aren't cached, the password hash is replaced by the digest token revocation compares.
+    """
+
+    cache_excluded_fields = ('password',)
+
+    @use_primary()
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if not read_cache.enabled or user_id is None:
+            return super().get_user(validated_token)
+
+        version = read_cache.get_version(f'{USERS_CACHE_NAMESPACE}:{user_id}')
+        key = f'auth:user:v2:{user_id}:{validated_token.get("iat")}:{version}'  # v2 rows hold no password hash
+        row = read_cache.get(key)
+        if row is None:
+            user = super().get_user(validated_token)
+            read_cache.set(key, self.dump_user(user), settings.AUTH_USER_CACHE_TIMEOUT)
+            return user
+
+        user, password_digest = self.load_user(row)
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != password_digest:
+            raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
+        return user
+
+    def get_cached_fields(self):
+        return [
+            field.attname
+            for field in self.user_model._meta.concrete_fields
+            if field.attname not in self.cache_excluded_fields
+        ]
+
+    def dump_user(self, user):
+        # A tuple: immutable in the process tier and a fresh instance on every load
+        return (get_md5_hash_password(user.password), *(getattr(user, name) for name in self.get_cached_fields()))
+
+    def load_user(self, row):
+        """Return the user, with excluded columns deferred to a query on access, and its password digest."""
+        password_digest, *values = row
+        user = self.user_model.from_db(router.db_for_read(self.user_model), self.get_cached_fields(), values)
+        return user, password_digest
@@ -0,0 +1,24 @@
+from django.db.models import Q
+from django_filters import rest_framework as filters
+
+from user.models import User
+
+
+class UserFilterSet(filters.FilterSet):
+    """Admin lookups on users, each backed by an index (see migration 0003_user_search_indexes)."""
+
+    email = filters.CharFilter(lookup_expr='istartswith')
+    name = filters.CharFilter(method='filter_name')
+    phone = filters.CharFilter(lookup_expr='icontains')
+    is_active = filters.BooleanFilter()
+    date_joined = filters.DateFromToRangeFilter()  # ?date_joined_after=&date_joined_before=, whole days included
+
+    class Meta:
+        model = User
+        fields = ('email', 'name', 'phone', 'is_active', 'date_joined')
+
+    @staticmethod
+    def filter_name(queryset, name, value):
+        for term in value.split():
+            queryset = queryset.filter(Q(first_name__icontains=term) | Q(last_name__icontains=term))
+        return queryset
@@ -0,0 +1,46 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.http import HttpRequest, QueryDict
+from rest_framework.request import Request
+
+from core.utils.export import FileFormat
+from user.services.export_users import export_users
+from user.views import UserViewSet
+
+
+class Command(BaseCommand):
+    help = 'Stream users as CSV or JSONL, filtered the same way as GET api/v1/users/export.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default='-', help='Output file, "-" writes stdout')
+        parser.add_argument('--format', choices=list(FileFormat), default=FileFormat.CSV)
+        parser.add_argument('--gzip', action='store_true')
+        parser.add_argument(
+            '--filter', action='append', default=[], metavar='NAME=VALUE', help='API filter param, repeatable'
+        )
+
+    def handle(self, *args, output, format, gzip, filter, **options):
+        chunks = export_users(self.get_queryset(filter), FileFormat(format), compress=gzip)
+        if output == '-':
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+            return
+        with open(output, 'wb') as file:
+            for chunk in chunks:
+                file.write(chunk)
+
+    @staticmethod
+    def get_queryset(filters):
+        params = QueryDict(mutable=True)
+        for item in filters:
+            name, separator, value = item.partition('=')
+            if not separator:
+                raise CommandError(f'Filter "{item}" must look like NAME=VALUE')
+            params.appendlist(name, value)
+        # Run the viewset's filter backends against a bare request, so the command matches the API
+        http_request = HttpRequest()
+        http_request.GET = params
+        view = UserViewSet(request=Request(http_request), action='export', format_kwarg=None, kwargs={}, args=())
+        return view.filter_queryset(view.get_queryset())
@@ -0,0 +1,30 @@
+import json
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.utils.export import FileFormat
+from user.services.import_users import import_users, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Bulk import users from a CSV or JSONL file, row errors are printed to stderr as JSON lines.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or JSONL file, "-" reads stdin')
+        parser.add_argument('--format', choices=list(FileFormat), help='Defaults to the file extension, csv for stdin')
+        parser.add_argument('--batch-size', type=int, default=settings.USER_IMPORT_BATCH_SIZE)
+        parser.add_argument('--workers', type=int, default=settings.USER_IMPORT_WORKERS)
+
+    def handle(self, *args, path, format, batch_size, workers, **options):
+        fmt = format or (FileFormat.JSONL if path.endswith('.jsonl') else FileFormat.CSV)
+        if path == '-':
+            report = import_users(read_rows(sys.stdin, fmt), batch_size=batch_size, workers=workers)
+        else:
+            with open(path, encoding='utf-8-sig', newline='') as stream:
+                report = import_users(read_rows(stream, fmt), batch_size=batch_size, workers=workers)
+
+        for error in report['errors']:
+            self.stderr.write(json.dumps(error))
+        self.stdout.write(self.style.SUCCESS(f'Created {report["created"]} users, {len(report["errors"])} rows failed'))
@@ -0,0 +1,77 @@
+import json
+import os
+import re
+import subprocess  # nosec B404 runs this interpreter only
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.utils.startup import RESULT_PREFIX
+
+IMPORT_TIME = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$')
+
+
+class Command(BaseCommand):
+    help = 'Start the app in fresh interpreters and report import time per module and time to the first request.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--server', choices=['wsgi', 'asgi'], default='wsgi')
+        parser.add_argument('--path', default='/api/v1/live', help='Path of the first request')
+        parser.add_argument('--repeat', type=int, default=3, help='Cold starts, the median one is reported')
+        parser.add_argument('--limit', type=int, default=20, help='Modules and packages to list')
+        parser.add_argument('--output', type=Path, default=None, help='Also write the report as JSON')
+
+    def handle(self, *args, server, path, repeat, limit, output, **options):
+        runs = sorted((self.run(server, path) for _ in range(max(repeat, 1))), key=lambda run: run['first_request_ms'])
+        report = runs[len(runs) // 2]
+        report['first_request_ms_runs'] = [run['first_request_ms'] for run in runs]
+        report['modules'] = report['modules'][:limit]
+        report['packages'] = report['packages'][:limit]
+
+        self.stdout.write(f'{server} {path} -> {report["status"]}')
+        self.stdout.write(f'  app ready        {report["app_ready_ms"]:>8} ms')
+        self.stdout.write(f'  first request    {report["first_request_ms"]:>8} ms (median of {len(runs)})')
+        self.stdout.write(f'  imports          {report["import_ms"]:>8} ms in {report["import_count"]} modules')
+        self.stdout.write('\nSelf import time per package:')
+        for name, ms in report['packages']:
+            self.stdout.write(f'  {ms:>8} ms  {name}')
+        self.stdout.write('\nSlowest modules (self / cumulative):')
+        for name, self_ms, cumulative_ms in report['modules']:
+            self.stdout.write(f'  {self_ms:>8} / {cumulative_ms:>8} ms  {name}')
+        if output:
+            output.parent.mkdir(parents=True, exist_ok=True)
+            output.write_text(json.dumps(report, indent=2))
+
+    @staticmethod
+    def run(server, path):
+        command = [sys.executable, '-X', 'importtime', '-m', 'core.utils.startup', server, path, str(time.time())]
+        process = subprocess.run(command, capture_output=True, text=True, env=os.environ.copy())  # nosec B603
+        result = next(
+            (line[len(RESULT_PREFIX) :] for line in process.stdout.splitlines() if line.startswith(RESULT_PREFIX)), None
+        )
+        if process.returncode or result is None:
+            raise CommandError(f'Startup probe failed:\n{process.stderr[-2000:]}')
+        return {**json.loads(result), **parse_import_times(process.stderr)}
+
+
+def parse_import_times(output: str):
+    """Aggregate `-X importtime` lines: top-level import time, per-package and per-module milliseconds."""
+    modules, packages, total_us = [], defaultdict(int), 0
+    for line in output.splitlines():
+        match = IMPORT_TIME.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = int(match[1]), int(match[2]), match[3], match[4]
+        if not indent:
+            total_us += cumulative_us
+        packages[name.partition('.')[0]] += self_us
+        modules.append((name, round(self_us / 1000, 1), round(cumulative_us / 1000, 1)))
+    return {
+        'import_ms': round(total_us / 1000, 1),
+        'import_count': len(modules),
+        'modules': sorted(modules, key=lambda module: module[1], reverse=True),
+        'packages': sorted(((name, round(us / 1000, 1)) for name, us in packages.items()), key=lambda item: -item[1]),
+    }
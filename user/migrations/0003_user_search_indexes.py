@@ -0,0 +1,43 @@
+# Generated by Django 5.2.2 on 2026-10-18 09:40
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+# Columns matched with icontains/istartswith, Django compares them as UPPER("column"::text) LIKE UPPER(%s)
+TRIGRAM_COLUMNS = ('email', 'first_name', 'last_name', 'phone')
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """GIN trigram indexes serving `LIKE '%term%'` on Postgres, other databases keep plain LIKE scans."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    table = schema_editor.quote_name(apps.get_model('user', 'User')._meta.db_table)
+    for column in TRIGRAM_COLUMNS:
+        schema_editor.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS user_user_{column}_trgm '
+            f'ON {table} USING gin ((UPPER({schema_editor.quote_name(column)}::text)) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for column in TRIGRAM_COLUMNS:
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS user_user_{column}_trgm')
+
+
+class Migration(migrations.Migration):
+    atomic = False  # Concurrent index builds don't lock the users table for writes, but can't run in a transaction
+
+    dependencies = [
+        ('user', '0002_remove_user_username'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['date_joined'], name='user_user_date_joined_idx'),
+        ),
+        TrigramExtension(),  # No-op on other databases
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes, elidable=False),
+    ]
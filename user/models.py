@@ -34,3 +34,5 @@ class User(AbstractUser):
 
     class Meta:
         ordering = ['-id']
+        # Text lookups use trigram indexes on Postgres, added in migration 0003 outside the model state
+        indexes = [models.Index(fields=['date_joined'], name='user_user_date_joined_idx')]
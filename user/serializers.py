@@ -1,9 +1,13 @@
 from air_drf_relation.serializers import AirModelSerializer
+from django.conf import settings
 from django.db import transaction
 from rest_framework import serializers
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt.settings import api_settings
 
 from user.functions.validate_user_password import validate_user_password
 from user.models import User
+from user.services.last_login import record_last_login
 
 
 class UserSerializer(AirModelSerializer):
@@ -40,3 +44,38 @@ class UserSerializer(AirModelSerializer):
             user.set_password(password)
             user.save()
         return user
+
+
+class UserImportSerializer(serializers.ModelSerializer):
+    """Row validation for `user.services.import_users`, email uniqueness is checked per batch there."""
+
+    password = serializers.CharField(write_only=True)
+
+    class Meta:
+        model = User
+        fields = ('email', 'first_name', 'last_name', 'phone', 'password')
+        extra_kwargs = {'email': {'validators': []}}
+
+    @staticmethod
+    def validate_email(value):
+        return User.objects.normalize_email(value)
+
+    @staticmethod
+    def validate_password(value):
+        validate_user_password(password=value)
+        return value
+
+
+class TokenObtainPairSerializer(jwt_serializers.TokenObtainPairSerializer):
+    """Token pair serializer that buffers the `last_login` write when LAST_LOGIN_BUFFERED is on."""
+
+    def validate(self, attrs):
+        if not settings.LAST_LOGIN_BUFFERED:
+            return super().validate(attrs)
+        data = jwt_serializers.TokenObtainSerializer.validate(self, attrs)
+        refresh = self.get_token(self.user)
+        data['refresh'] = str(refresh)
+        data['access'] = str(refresh.access_token)
+        if api_settings.UPDATE_LAST_LOGIN:
+            record_last_login(self.user)
+        return data
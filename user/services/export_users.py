@@ -0,0 +1,11 @@
+from django.conf import settings
+
+from core.utils.export import FileFormat, gzip_stream, stream_rows
+
+USER_EXPORT_FIELDS = ('id', 'email', 'first_name', 'last_name', 'phone', 'is_staff')
+
+
+def export_users(queryset, fmt: FileFormat, compress: bool = False):
+    """Byte chunks of the users in `queryset` as CSV or JSONL, optionally gzipped."""
+    chunks = stream_rows(queryset, USER_EXPORT_FIELDS, fmt, chunk_size=settings.USER_EXPORT_CHUNK_SIZE)
+    return gzip_stream(chunks) if compress else chunks
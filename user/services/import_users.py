@@ -0,0 +1,117 @@
+import csv
+import itertools
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+
+from core.utils.cache import invalidate_read_cache
+from core.utils.db import use_primary
+from core.utils.export import FileFormat
+from core.utils.logger import Logg
+from user.models import User
+from user.serializers import UserImportSerializer
+from user.signals import USERS_CACHE_NAMESPACE
+
+
+def read_rows(stream, fmt: FileFormat):
+    """Yield `(row_number, row)` from a text stream, `row` is None for lines that aren't JSON objects.
+
+    Rows are numbered from 1 without the CSV header and blank JSONL lines, like items of a JSON list.
+    """
+    if fmt == FileFormat.CSV:
+        for number, row in enumerate(csv.DictReader(stream), start=1):
+            # Empty cells mean "not set", extra cells of ragged rows land under the None key
+            yield number, {key: value for key, value in row.items() if key is not None and value != ''}
+        return
+    lines = (line for line in stream if line.strip())
+    for number, line in enumerate(lines, start=1):
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield number, row if isinstance(row, dict) else None
+
+
+def import_users(rows, batch_size: int, workers: int = 0):
+    """Create users from `(row_number, row)` pairs in batches, collecting row-level errors instead of failing.
+
+    Passwords are hashed in a pool of `workers` processes (inline when 0) and every batch is
+    inserted with one `bulk_create`. Only the management command uses a pool: forking a web worker
+    with running threads can deadlock the children. Returns `{'created': int, 'errors': [{'row': int, 'errors': {...}}]}`.
+    """
+    report = {'created': 0, 'errors': []}
+    seen_emails = set()
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
+    try:
+        for batch in itertools.batched(rows, batch_size):
+            valid = _validate_batch(batch, seen_emails, report['errors'])
+            if not valid:
+                continue
+            passwords = [data.pop('password') for _, data in valid]
+            hashes = _hash_passwords(passwords, executor, workers)
+            users = [User(password=password, **data) for (_, data), password in zip(valid, hashes)]
+            report['created'] += _create_batch(valid, users, report['errors'])
+            Logg.info(e='user.import', msg='batch imported', created=report['created'], errors=len(report['errors']))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    report['errors'].sort(key=lambda error: error['row'])
+    if report['created']:
+        invalidate_read_cache(USERS_CACHE_NAMESPACE)  # bulk_create sends no post_save
+    return report
+
+
+@use_primary()  # Must see the rows of earlier batches, a replica may not have them yet
+def _validate_batch(batch, seen_emails, errors):
+    valid = []
+    for number, row in batch:
+        if row is None:
+            errors.append({'row': number, 'errors': {'non_field_errors': ['Invalid row.']}})
+            continue
+        serializer = UserImportSerializer(data=row)
+        if not serializer.is_valid():
+            errors.append({'row': number, 'errors': serializer.errors})
+            continue
+        email = serializer.validated_data['email']
+        if email in seen_emails:
+            errors.append({'row': number, 'errors': {'email': ['Duplicate email in the import.']}})
+            continue
+        seen_emails.add(email)
+        valid.append((number, serializer.validated_data))
+
+    # One query for the uniqueness of the whole batch instead of UniqueValidator per row
+    existing = set(User.objects.filter(email__in=[data['email'] for _, data in valid]).values_list('email', flat=True))
+    for number, data in valid:
+        if data['email'] in existing:
+            errors.append({'row': number, 'errors': {'email': ['user with this email already exists.']}})
+    return [(number, data) for number, data in valid if data['email'] not in existing]
+
+
+def _hash_passwords(passwords, executor, workers):
+    if executor is None:
+        return [make_password(password) for password in passwords]
+    return list(executor.map(make_password, passwords, chunksize=max(1, len(passwords) // (workers * 4))))
+
+
+def _create_batch(valid, users, errors):
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+    except IntegrityError:
+        # A concurrent insert took one of the emails, find the rows one by one
+        return _create_one_by_one(valid, users, errors)
+    return len(users)
+
+
+def _create_one_by_one(valid, users, errors):
+    created = 0
+    for (number, _), user in zip(valid, users):
+        try:
+            with transaction.atomic():
+                user.save(force_insert=True)
+            created += 1
+        except IntegrityError as exc:
+            errors.append({'row': number, 'errors': {'non_field_errors': [str(exc)]}})
+    return created
@@ -0,0 +1,38 @@
+from datetime import datetime
+
+from django.utils import timezone
+
+from core.utils.buffer import get_hash_buffer
+from core.utils.logger import Logg
+from user.models import User
+
+LAST_LOGIN_BUFFER = 'user:last_login'
+
+
+def record_last_login(user: User):
+    """Set `last_login` on the instance and buffer the write for `flush_last_login`, or write it without a buffer."""
+    user.last_login = timezone.now()
+    buffer = get_hash_buffer(LAST_LOGIN_BUFFER)
+    if buffer is None:
+        User.objects.filter(pk=user.pk).update(last_login=user.last_login)
+        return
+    buffer.put(str(user.pk), user.last_login.isoformat())
+
+
+def flush_last_login(batch_size: int = 500):
+    """Write buffered `last_login` values with bulk updates, return the number of users written."""
+    buffer = get_hash_buffer(LAST_LOGIN_BUFFER)
+    if buffer is None:
+        return 0
+    items = buffer.drain()
+    if not items:
+        return 0
+    users = [User(pk=int(pk), last_login=datetime.fromisoformat(value)) for pk, value in items.items()]
+    try:
+        # bulk_update doesn't send post_save: last_login isn't part of cached API or auth data
+        User.objects.bulk_update(users, ['last_login'], batch_size=batch_size)
+    except Exception as exc:
+        buffer.restore(items)
+        Logg.error(e='user.flush_last_login', msg='flush failed, values restored', error=str(exc), users=len(items))
+        raise
+    return len(users)
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.utils.cache import invalidate_read_cache
+from user.models import User
+
+USERS_CACHE_NAMESPACE = 'users'
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user_cache(sender, instance, **kwargs):
+    invalidate_read_cache(USERS_CACHE_NAMESPACE, instance.pk)
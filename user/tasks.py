@@ -1,10 +1,17 @@
 from celery import shared_task
 
+from core import celery_app  # noqa: F401 Shared tasks sent from web processes need the configured app
 from core.celery.celery_enums import CeleryTasks
 from core.utils.logger import Logg
+from user.services.last_login import flush_last_login
 
 
 @shared_task(name=CeleryTasks.USER_EXAMPLE)
 def user_example():
     Logg.info(e=CeleryTasks.USER_EXAMPLE)
     return {'success': True}
+
+
+@shared_task(name=CeleryTasks.USER_FLUSH_LAST_LOGIN)
+def user_flush_last_login():
+    return {'success': True, 'users': flush_last_login()}
@@ -1,11 +1,31 @@
 # Create your tests here.
+import base64
+import contextlib
+import gzip
+import io
+import json
+import tempfile
+from unittest import mock
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import AsyncRequestFactory, TestCase, override_settings
 from rest_framework import serializers
+from rest_framework.test import force_authenticate
+from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.utils import get_md5_hash_password
 
+from core.utils.buffer import get_hash_buffer
+from core.utils.cache import read_cache
+from core.utils.counting import CountStrategy
+from user.authentication import CachedJWTAuthentication
 from user.functions.validate_user_password import validate_user_password
 from user.orm.get_users import get_active_users
+from user.services.last_login import LAST_LOGIN_BUFFER
+from user.tasks import user_flush_last_login
+from user.views import AsyncUserViewSet, UserViewSet
 
 User = get_user_model()
 
@@ -77,3 +97,495 @@ class GetActiveUsersTests(TestCase):
         active_users = get_active_users()
         inactive_emails = [user.email for user in active_users if not user.is_active]
         self.assertEqual(len(inactive_emails), 0)
+
+
+class UserListKeysetPaginationTests(TestCase):
+    """Tests for keyset pagination of the users list."""
+
+    def setUp(self):
+        """Set up test data."""
+        for index in range(5):
+            User.objects.create(email=f'user{index}@example.com', first_name='User', last_name=str(index))
+
+    def test_keyset_pages_follow_ordering(self):
+        """Test that next/previous cursors walk the list in the model ordering."""
+        expected_ids = list(User.objects.values_list('id', flat=True))
+
+        first_page = self.client.get('/api/v1/users', {'pagination': 'keyset', 'page_size': 2}).json()
+        self.assertEqual([user['id'] for user in first_page['results']], expected_ids[:2])
+        self.assertIsNone(first_page['previous'])
+        self.assertNotIn('total', first_page)
+
+        second_page = self.client.get('/api/v1/users', {'cursor': first_page['next'], 'page_size': 2}).json()
+        self.assertEqual([user['id'] for user in second_page['results']], expected_ids[2:4])
+
+        back_page = self.client.get('/api/v1/users', {'cursor': second_page['previous'], 'page_size': 2}).json()
+        self.assertEqual([user['id'] for user in back_page['results']], expected_ids[:2])
+        self.assertIsNone(back_page['previous'])
+
+        last_page = self.client.get('/api/v1/users', {'cursor': second_page['next'], 'page_size': 2}).json()
+        self.assertEqual([user['id'] for user in last_page['results']], expected_ids[4:])
+        self.assertIsNone(last_page['next'])
+
+    def test_nullable_ordering_falls_back_to_pages(self):
+        """Test that orderings on nullable fields use page numbers, cursors can't seek past NULLs."""
+        User.objects.filter(last_name__in=('1', '3')).update(phone='+100')
+        with mock.patch.object(UserViewSet, 'queryset', User.objects.order_by('phone', 'id')):
+            response = self.client.get('/api/v1/users', {'pagination': 'keyset', 'page_size': 2}).json()
+        self.assertEqual(response['total'], 5)
+        self.assertNotIn('next', response)
+
+    def test_invalid_cursor_returns_not_found(self):
+        """Test that a malformed cursor is rejected."""
+        response = self.client.get('/api/v1/users', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_tampered_cursor_positions_return_not_found(self):
+        """Test that well-formed cursors with positions of the wrong type are rejected, not a server error."""
+        for position in (['abc'], [{'x': 1}], [None]):
+            with self.subTest(position=position):
+                data = json.dumps({'p': position, 'r': 0}).encode()
+                cursor = base64.urlsafe_b64encode(data).decode().rstrip('=')
+                response = self.client.get('/api/v1/users', {'cursor': cursor})
+                self.assertEqual(response.status_code, 404)
+
+
+class UserListStreamTests(TestCase):
+    """Tests for streaming the whole users list."""
+
+    def setUp(self):
+        """Set up test data."""
+        for index in range(3):
+            User.objects.create(email=f'user{index}@example.com', first_name='User', last_name=str(index))
+
+    def test_page_size_all_is_streamed_in_envelope(self):
+        """Test that page_size=all streams every user in the usual envelope."""
+        response = self.client.get('/api/v1/users', {'page_size': 'all'})
+        self.assertTrue(response.streaming)
+        data = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(data['total'], 3)
+        self.assertEqual(data['page_size'], 3)
+        self.assertEqual(data['last_page'], 1)
+        self.assertEqual([user['id'] for user in data['results']], list(User.objects.values_list('id', flat=True)))
+
+
+@override_settings(API_CACHE_ENABLED=False)  # Both paths must render, not replay a cached body
+class UserValuesReadTests(TestCase):
+    """Tests for serving user reads from values() rows through the compiled layout."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create(email='user0@example.com', first_name='User', last_name='0', phone='+100')
+        for index in range(1, 4):
+            User.objects.create(email=f'user{index}@example.com', first_name='User', last_name=str(index))
+
+    def get_both(self, path, params=None, **extra):
+        """Return response contents with the layout and with the regular serializer."""
+        fast = self.client.get(path, params, **extra)
+        with mock.patch.object(UserViewSet, 'get_read_layout', return_value=None):
+            regular = self.client.get(path, params, **extra)
+        self.assertEqual(fast.status_code, 200)
+        if fast.streaming:
+            return b''.join(fast.streaming_content), b''.join(regular.streaming_content)
+        return fast.content, regular.content
+
+    def test_responses_are_identical_to_serializer(self):
+        """Test that list, keyset, stream, retrieve and me render the same bytes as the serializer."""
+        token = AccessToken.for_user(self.user)
+        cases = [
+            ('/api/v1/users', {'page_size': 2}, {}),
+            ('/api/v1/users', {'pagination': 'keyset', 'page_size': 2}, {}),
+            ('/api/v1/users', {'page_size': 'all'}, {}),
+            (f'/api/v1/users/{self.user.pk}', None, {}),
+            ('/api/v1/users/me', None, {'HTTP_AUTHORIZATION': f'Bearer {token}'}),
+        ]
+        for path, params, extra in cases:
+            with self.subTest(path=path, params=params):
+                fast, regular = self.get_both(path, params, **extra)
+                self.assertEqual(fast, regular)
+
+    def test_list_fetches_values_rows(self):
+        """Test that the list selects only the serialized columns."""
+        with self.assertNumQueries(2) as queries:
+            self.client.get('/api/v1/users')
+        select = queries.captured_queries[-1]['sql']
+        self.assertNotIn('password', select)
+        self.assertNotIn('last_login', select)
+
+    def test_retrieve_checks_permissions_on_instance(self):
+        """Test that object permissions receive a model instance, not a values() row."""
+        with mock.patch.object(UserViewSet, 'check_object_permissions') as check:
+            response = self.client.get(f'/api/v1/users/{self.user.pk}')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(check.call_args.args[1], User)
+
+
+@override_settings(API_CACHE_ENABLED=False)
+class UserSparseFieldsTests(TestCase):
+    """Tests for narrowing user responses and queries with ?fields=."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create(email='sparse@example.com', first_name='Sparse', last_name='User')
+
+    def test_list_returns_and_selects_requested_fields(self):
+        """Test that only requested fields are returned and selected, with values() rows and with .only()."""
+        for layout in (True, False):
+            patch = (
+                contextlib.nullcontext()
+                if layout
+                else mock.patch.object(UserViewSet, 'get_read_layout', return_value=None)
+            )
+            with self.subTest(layout=layout), patch, self.assertNumQueries(2) as queries:
+                response = self.client.get('/api/v1/users', {'fields': 'email,id'})
+            self.assertEqual(response.json()['results'], [{'id': self.user.pk, 'email': 'sparse@example.com'}])
+            self.assertNotIn('first_name', queries.captured_queries[-1]['sql'])
+
+    def test_retrieve_and_me_are_narrowed(self):
+        """Test that detail responses keep only the requested fields."""
+        response = self.client.get(f'/api/v1/users/{self.user.pk}', {'fields': 'last_name'})
+        self.assertEqual(response.json(), {'last_name': 'User'})
+
+        token = AccessToken.for_user(self.user)
+        response = self.client.get('/api/v1/users/me', {'fields': 'id'}, HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(response.json(), {'id': self.user.pk})
+
+    def test_empty_selection_returns_all_fields(self):
+        """Test that ?fields= without names is ignored instead of returning empty objects."""
+        for value in ('', ',', ' , '):
+            with self.subTest(value=value):
+                results = self.client.get('/api/v1/users', {'fields': value}).json()['results']
+                self.assertEqual(results[0]['email'], 'sparse@example.com')
+                self.assertIn('last_name', results[0])
+
+    def test_unknown_field_is_rejected(self):
+        """Test that unknown and write-only fields are a validation error."""
+        response = self.client.get('/api/v1/users', {'fields': 'id,password'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('password', response.json()['fields'][0])
+
+
+class UserFilterTests(TestCase):
+    """Tests for UserFilterSet and search on the users list."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.ada = User.objects.create(email='ada@example.com', first_name='Ada', last_name='Lovelace', phone='+44555')
+        self.alan = User.objects.create(email='alan@test.org', first_name='Alan', last_name='Turing', is_active=False)
+        User.objects.filter(pk=self.alan.pk).update(date_joined='2020-01-01 00:00:00')
+
+    def get_emails(self, params):
+        """Return emails of the list filtered by params."""
+        response = self.client.get('/api/v1/users', params)
+        self.assertEqual(response.status_code, 200)
+        return [user['email'] for user in response.json()['results']]
+
+    def test_filters(self):
+        """Test email prefix, name, phone, is_active and date_joined range filters."""
+        cases = [
+            ({'email': 'AL'}, ['alan@test.org']),
+            ({'name': 'love ad'}, ['ada@example.com']),
+            ({'name': 'turing'}, ['alan@test.org']),
+            ({'phone': '555'}, ['ada@example.com']),
+            ({'is_active': 'false'}, ['alan@test.org']),
+            ({'date_joined_before': '2020-01-01'}, ['alan@test.org']),
+            ({'date_joined_after': '2020-01-02', 'is_active': 'true'}, ['ada@example.com']),
+        ]
+        for params, emails in cases:
+            with self.subTest(params=params):
+                self.assertEqual(self.get_emails(params), emails)
+
+    def test_search_matches_any_field(self):
+        """Test that every search term must match email, names or phone."""
+        self.assertEqual(self.get_emails({'search': 'example'}), ['ada@example.com'])
+        self.assertEqual(self.get_emails({'search': 'a TURING'}), ['alan@test.org'])
+        self.assertEqual(self.get_emails({'search': '+44'}), ['ada@example.com'])
+
+    def test_invalid_range_is_rejected(self):
+        """Test that malformed dates are a validation error."""
+        response = self.client.get('/api/v1/users', {'date_joined_after': 'yesterday'})
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class UserListCountStrategyTests(TestCase):
+    """Tests for count strategies of the users list."""
+
+    def setUp(self):
+        """Set up test data."""
+        for index in range(2):
+            User.objects.create(email=f'user{index}@example.com', first_name='User', last_name=str(index))
+
+    def test_cached_count_skips_count_query(self):
+        """Test that the cached strategy reuses the total for the same filters."""
+        with mock.patch.object(UserViewSet, 'pagination_count_strategy', CountStrategy.CACHED, create=True):
+            self.assertEqual(self.client.get('/api/v1/users').json()['total'], 2)
+            User.objects.create(email='user2@example.com', first_name='User', last_name='2')
+            with self.assertNumQueries(1):
+                data = self.client.get('/api/v1/users').json()
+        self.assertEqual(data['total'], 2)
+        self.assertEqual(len(data['results']), 3)
+
+    def test_estimated_count_falls_back_to_exact(self):
+        """Test that the estimated strategy returns an exact total outside Postgres."""
+        with mock.patch.object(UserViewSet, 'pagination_count_strategy', CountStrategy.ESTIMATED, create=True):
+            self.assertEqual(self.client.get('/api/v1/users').json()['total'], 2)
+
+
+@override_settings(
+    API_CACHE_ENABLED=True, CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+)
+class UserReadCacheTests(TestCase):
+    """Tests for the two-tier read cache of the users API."""
+
+    def setUp(self):
+        """Set up test data and empty both cache tiers."""
+        cache.clear()
+        read_cache.local.clear()
+        self.user = User.objects.create(email='cached@example.com', first_name='Cached', last_name='User')
+
+    def test_repeated_retrieve_skips_database(self):
+        """Test that a second retrieve is served from the cache."""
+        first = self.client.get(f'/api/v1/users/{self.user.pk}')
+        with self.assertNumQueries(0):
+            second = self.client.get(f'/api/v1/users/{self.user.pk}')
+        self.assertEqual(first.content, second.content)
+
+    def test_save_invalidates_detail_and_list(self):
+        """Test that saving a user drops its cached detail and the cached lists."""
+        self.assertEqual(self.client.get('/api/v1/users').json()['total'], 1)
+        self.client.get(f'/api/v1/users/{self.user.pk}')
+        self.user.first_name = 'Changed'
+        self.user.save()
+        User.objects.create(email='other@example.com', first_name='Other', last_name='User')
+
+        self.assertEqual(self.client.get(f'/api/v1/users/{self.user.pk}').json()['first_name'], 'Changed')
+        self.assertEqual(self.client.get('/api/v1/users').json()['total'], 2)
+
+    def test_query_params_are_part_of_list_key(self):
+        """Test that lists with different params are cached separately."""
+        User.objects.create(email='other@example.com', first_name='Other', last_name='User')
+        self.assertEqual(len(self.client.get('/api/v1/users', {'page_size': 1}).json()['results']), 1)
+        self.assertEqual(len(self.client.get('/api/v1/users', {'page_size': 2}).json()['results']), 2)
+
+
+@override_settings(
+    API_CACHE_ENABLED=True, CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+)
+class CachedJWTAuthenticationTests(TestCase):
+    """Tests for resolving JWT users from the cache."""
+
+    def setUp(self):
+        """Set up a user with an access token."""
+        cache.clear()
+        read_cache.local.clear()
+        self.user = User.objects.create(email='jwt@example.com', first_name='Jwt', last_name='User')
+        self.headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(self.user)}'}
+
+    def test_cached_user_skips_database(self):
+        """Test that a repeated authenticated request runs no queries."""
+        self.assertEqual(self.client.get('/api/v1/users/me', **self.headers).json()['email'], 'jwt@example.com')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/v1/users/me', **self.headers)
+        self.assertEqual(response.status_code, 200)
+
+    def test_cached_row_leaves_out_password_hash(self):
+        """Test that the cached row holds the revocation digest, not the hash, which loads on access."""
+        self.user.set_password('Passw0rd!')
+        self.user.save()
+        authentication = CachedJWTAuthentication()
+        row = authentication.dump_user(self.user)
+        self.assertNotIn(self.user.password, row)
+
+        user, password_digest = authentication.load_user(row)
+        self.assertEqual(password_digest, get_md5_hash_password(self.user.password))
+        self.assertIn('password', user.get_deferred_fields())
+        self.assertEqual(user.email, 'jwt@example.com')
+        self.assertTrue(user.check_password('Passw0rd!'))
+
+    def test_deactivation_invalidates_cached_user(self):
+        """Test that an inactive user is rejected right after the change."""
+        self.client.get('/api/v1/users/me', **self.headers)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/v1/users/me', **self.headers).status_code, 401)
+
+
+@override_settings(LAST_LOGIN_BUFFERED=True)
+class BufferedLastLoginTests(TestCase):
+    """Tests for buffered last_login updates on token issue."""
+
+    def setUp(self):
+        """Set up a user with a password and an empty buffer."""
+        get_hash_buffer(LAST_LOGIN_BUFFER).drain()
+        self.user = User(email='login@example.com', first_name='Login', last_name='User')
+        self.user.set_password('Passw0rd!')
+        self.user.save()
+
+    def test_token_issue_defers_last_login_to_flush(self):
+        """Test that the token view skips the write and the beat task applies it."""
+        response = self.client.post('/api/v1/token/', {'email': 'login@example.com', 'password': 'Passw0rd!'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('access', response.json())
+        self.user.refresh_from_db()
+        self.assertIsNone(self.user.last_login)
+
+        self.assertEqual(user_flush_last_login()['users'], 1)
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_login)
+        self.assertEqual(user_flush_last_login()['users'], 0)
+
+    @override_settings(CELERY_TASK_ALWAYS_EAGER=False)
+    def test_token_issue_writes_through_without_shared_buffer(self):
+        """Test that without Redis or eager tasks last_login is written right away instead of lost."""
+        response = self.client.post('/api/v1/token/', {'email': 'login@example.com', 'password': 'Passw0rd!'})
+        self.assertEqual(response.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_login)
+        self.assertEqual(user_flush_last_login()['users'], 0)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class UserImportTests(TestCase):
+    """Tests for the bulk user import."""
+
+    def setUp(self):
+        """Set up an admin user and an existing user."""
+        self.admin = User.objects.create(email='admin@example.com', first_name='Admin', last_name='User', is_staff=True)
+        User.objects.create(email='taken@example.com', first_name='Taken', last_name='User')
+
+    def test_command_imports_csv_with_row_errors(self):
+        """Test that the command hashes in a pool, creates valid rows and reports the others."""
+        with tempfile.NamedTemporaryFile('w', suffix='.csv') as file:
+            file.write('email,first_name,last_name,phone,password\n')
+            file.write('new1@example.com,New,One,,Str0ng-Passw0rd\n')
+            file.write('new2@example.com,New,Two,+100,Str0ng-Passw0rd\n')
+            file.write('taken@example.com,Taken,Again,,Str0ng-Passw0rd\n')
+            file.write('new1@example.com,New,Duplicate,,Str0ng-Passw0rd\n')
+            file.write('weak@example.com,Weak,Password,,123\n')
+            file.flush()
+            stderr = io.StringIO()
+            call_command('import_users', file.name, batch_size=2, workers=2, stdout=io.StringIO(), stderr=stderr)
+
+        errors = [json.loads(line) for line in stderr.getvalue().splitlines()]
+        self.assertEqual([error['row'] for error in errors], [3, 4, 5])  # Data rows, like JSON list items
+        self.assertIn('password', errors[2]['errors'])
+        user = User.objects.get(email='new2@example.com')
+        self.assertEqual(user.phone, '+100')
+        self.assertTrue(user.check_password('Str0ng-Passw0rd'))
+        self.assertIsNone(User.objects.get(email='new1@example.com').phone)
+
+    def test_endpoint_imports_json_batch(self):
+        """Test that admins can import a JSON list and get the report back."""
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(self.admin)}'}
+        rows = [
+            {'email': 'api@example.com', 'first_name': 'Api', 'last_name': 'User', 'password': 'Str0ng-Passw0rd'},
+            {'email': 'broken'},
+        ]
+        with mock.patch('user.services.import_users.ProcessPoolExecutor') as executor:
+            response = self.client.post('/api/v1/users/import', rows, content_type='application/json', **headers)
+        executor.assert_not_called()  # Web workers never fork a pool
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created'], 1)
+        self.assertEqual(response.json()['errors'][0]['row'], 2)
+        self.assertTrue(User.objects.filter(email='api@example.com').exists())
+
+    def test_endpoint_rejects_non_utf8_file(self):
+        """Test that a file in another encoding is a validation error instead of a server error."""
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(self.admin)}'}
+        upload = SimpleUploadedFile('users.csv', 'email,first_name\nzoë@example.com,Zoë\n'.encode('latin-1'))
+        response = self.client.post('/api/v1/users/import', {'file': upload}, **headers)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('file', response.json())
+        self.assertFalse(User.objects.filter(first_name='Zoë').exists())
+
+    def test_endpoint_requires_admin(self):
+        """Test that non-admin users can't import."""
+        response = self.client.post('/api/v1/users/import', [], content_type='application/json')
+        self.assertEqual(response.status_code, 401)
+
+
+class UserExportTests(TestCase):
+    """Tests for the streaming users export."""
+
+    def setUp(self):
+        """Set up an admin user and regular users."""
+        self.admin = User.objects.create(email='admin@example.com', first_name='Admin', last_name='User', is_staff=True)
+        self.headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(self.admin)}'}
+        for index in range(3):
+            User.objects.create(email=f'user{index}@example.com', first_name='User', last_name=str(index))
+
+    def test_export_streams_csv(self):
+        """Test that the export action streams a CSV with a header and every user."""
+        response = self.client.get('/api/v1/users/export', **self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'id,email,first_name,last_name,phone,is_staff')
+        self.assertEqual(len(lines), 5)
+
+    def test_export_escapes_formulas_in_csv(self):
+        """Test that CSV cells a spreadsheet would evaluate are quoted, JSONL keeps the raw values."""
+        User.objects.filter(last_name='0').update(first_name='=HYPERLINK("http://x")', phone='+100')
+        content = b''.join(self.client.get('/api/v1/users/export', **self.headers).streaming_content).decode()
+        self.assertIn('"\'=HYPERLINK(""http://x"")",0,\'+100', content)
+        response = self.client.get('/api/v1/users/export', {'file_format': 'jsonl'}, **self.headers)
+        self.assertIn('"first_name": "=HYPERLINK', b''.join(response.streaming_content).decode())
+
+    def test_export_streams_gzipped_jsonl(self):
+        """Test that JSONL output can be gzipped."""
+        response = self.client.get('/api/v1/users/export', {'file_format': 'jsonl', 'gzip': 'true'}, **self.headers)
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        rows = [json.loads(line) for line in gzip.decompress(b''.join(response.streaming_content)).splitlines()]
+        self.assertEqual({row['email'] for row in rows}, set(User.objects.values_list('email', flat=True)))
+
+    def test_export_rejects_unknown_format(self):
+        """Test that an unknown file format is a validation error."""
+        response = self.client.get('/api/v1/users/export', {'file_format': 'xml'}, **self.headers)
+        self.assertEqual(response.status_code, 400)
+
+    def test_command_writes_file(self):
+        """Test that the command writes the same CSV to a file."""
+        with tempfile.NamedTemporaryFile(suffix='.csv') as file:
+            call_command('export_users', output=file.name)
+            lines = file.read().decode().splitlines()
+        self.assertEqual(len(lines), 5)
+
+
+class AsyncUserViewSetTests(TestCase):
+    """Tests for async read paths of the users API."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.factory = AsyncRequestFactory()
+        self.user = User.objects.create(email='async@example.com', first_name='Async', last_name='User')
+
+    async def test_list_returns_paginated_users(self):
+        """Test that the async list keeps the pagination envelope."""
+        view = AsyncUserViewSet.as_view({'get': 'list'})
+        response = await view(self.factory.get('/api/v1/users'))
+        response.render()
+        data = json.loads(response.content)
+        self.assertEqual(data['total'], 1)
+        self.assertEqual(data['results'][0]['email'], 'async@example.com')
+
+    async def test_retrieve_and_me_return_user(self):
+        """Test that async retrieve and me serialize the user."""
+        retrieve = AsyncUserViewSet.as_view({'get': 'retrieve'})
+        response = await retrieve(self.factory.get(f'/api/v1/users/{self.user.pk}'), pk=self.user.pk)
+        self.assertEqual(response.data['id'], self.user.pk)
+
+        request = self.factory.get('/api/v1/users/me')
+        force_authenticate(request, user=self.user)
+        response = await AsyncUserViewSet.as_view({'get': 'me'})(request)
+        self.assertEqual(response.data['email'], 'async@example.com')
+
+    async def test_export_streams_async_content(self):
+        """Test that the async export feeds an async iterator to the response."""
+        self.user.is_staff = True
+        request = self.factory.get('/api/v1/users/export')
+        force_authenticate(request, user=self.user)
+        response = await AsyncUserViewSet.as_view({'get': 'export'})(request)
+        self.assertTrue(response.is_async)
+        content = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertIn(b'async@example.com', content)
@@ -1,7 +1,9 @@
+from django.conf import settings
+
 from core.utils.router import BaseSimpleRouter
 
-from .views import UserViewSet
+from .views import AsyncUserViewSet, UserViewSet
 
 router = BaseSimpleRouter()
-router.register(r'users', UserViewSet, basename='users')
+router.register(r'users', AsyncUserViewSet if settings.SERVER_MODE == 'asgi' else UserViewSet, basename='users')
 urlpatterns = router.urls
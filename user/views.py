@@ -1,30 +1,132 @@
+import csv
+import io
+import itertools
 from datetime import datetime
 
-from rest_framework import viewsets
+from adrf import viewsets as async_viewsets
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import filters, viewsets
 from rest_framework.decorators import action
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 
+from core.utils.export import CONTENT_TYPES, FileFormat, aiterate
 from core.utils.logger import Logg
+from core.utils.mixins import CachedReadMixin, SparseFieldsMixin, ValuesReadMixin
+from user.filters import UserFilterSet
 from user.models import User
 from user.serializers import UserSerializer
+from user.services.export_users import export_users
+from user.services.import_users import import_users, read_rows
+from user.signals import USERS_CACHE_NAMESPACE
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(CachedReadMixin, ValuesReadMixin, SparseFieldsMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
+    cache_namespace = USERS_CACHE_NAMESPACE
+    sparse_fields_actions = ('list', 'retrieve', 'me')
+    filter_backends = (DjangoFilterBackend, filters.SearchFilter)
+    filterset_class = UserFilterSet
+    search_fields = ('email', 'first_name', 'last_name', 'phone')
 
     def get_permissions(self):
         if self.action in ('me',):
             return [IsAuthenticated()]
+        if self.action in ('bulk_import', 'export'):
+            return [IsAdminUser()]
         return []
 
     @action(methods=['GET'], detail=False)
     def me(self, request):
-        return Response(self.get_serializer(self.request.user).data)
+        key = self.get_detail_cache_key(request, request.user.pk)
+        return self.cached(key, lambda: Response(self.get_serializer(self.request.user).data))
+
+    @action(methods=['POST'], detail=False, url_path='import')
+    def bulk_import(self, request):
+        """Import a batch of users from a JSON list or an uploaded `file` (.csv or .jsonl)."""
+        upload = request.FILES.get('file')
+        if upload is not None:
+            fmt = FileFormat.JSONL if upload.name.endswith('.jsonl') else FileFormat.CSV
+            rows = read_rows(io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline=''), fmt)
+        elif isinstance(request.data, list):
+            rows = ((number, row if isinstance(row, dict) else None) for number, row in enumerate(request.data, 1))
+        else:
+            raise ValidationError({'non_field_errors': ['Expected a list of users or a file.']})
+
+        try:
+            rows = list(itertools.islice(rows, settings.USER_IMPORT_MAX_ROWS + 1))
+        except UnicodeDecodeError:
+            raise ValidationError({'file': ['Expected a UTF-8 encoded file.']}) from None
+        except csv.Error as exc:
+            raise ValidationError({'file': [f'Malformed CSV: {exc}.']}) from None
+        if len(rows) > settings.USER_IMPORT_MAX_ROWS:
+            raise ValidationError({'non_field_errors': [f'At most {settings.USER_IMPORT_MAX_ROWS} rows per request.']})
+        # Hashed inline, forking a pool from a threaded web worker can deadlock, hence USER_IMPORT_MAX_ROWS
+        report = import_users(rows, batch_size=settings.USER_IMPORT_BATCH_SIZE)
+        return Response(report)
+
+    @action(methods=['GET'], detail=False)
+    def export(self, request):
+        """Stream the filtered users as `?file_format=csv|jsonl`, gzipped with `?gzip=true`."""
+        fmt = request.query_params.get('file_format', FileFormat.CSV)
+        if fmt not in FileFormat:
+            raise ValidationError({'file_format': [f'Expected one of: {", ".join(FileFormat)}.']})
+        compress = request.query_params.get('gzip') in ('1', 'true')
+
+        content = export_users(self.filter_queryset(self.get_queryset()), FileFormat(fmt), compress=compress)
+        if getattr(self, 'view_is_async', False):
+            content = aiterate(content)
+        filename = f'users.{fmt}.gz' if compress else f'users.{fmt}'
+        response = StreamingHttpResponse(content, content_type='application/gzip' if compress else CONTENT_TYPES[fmt])
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
 
     @action(methods=['GET'], detail=False)
     def test(self, request):
         _now = str(datetime.now())
         Logg.info(e='user.test', msg='test method', success=True, now=_now)
         return Response({'success': True, 'now': _now})
+
+
+class AsyncUserViewSet(async_viewsets.GenericViewSet, UserViewSet):
+    """UserViewSet with async read paths, routed instead of it when SERVER_MODE=asgi.
+
+    Write actions stay sync and run in a thread per request.
+    """
+
+    async def list(self, request, *args, **kwargs):
+        key = await sync_to_async(self.get_list_cache_key)(request)
+        return await self.acached(key, self._alist)
+
+    async def retrieve(self, request, *args, **kwargs):
+        key = await sync_to_async(self.get_detail_cache_key)(request, self.kwargs[self.lookup_field])
+        return await self.acached(key, self._aretrieve)
+
+    @action(methods=['GET'], detail=False)
+    async def me(self, request):
+        key = await sync_to_async(self.get_detail_cache_key)(request, request.user.pk)
+        return await self.acached(key, self._ame)
+
+    async def _alist(self):
+        queryset = await self.afilter_queryset(self.get_queryset())
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            return await self.get_apaginated_response(await self.aserialize(page, many=True))
+        users = [user async for user in queryset]
+        return Response(await self.aserialize(users, many=True))
+
+    async def _aretrieve(self):
+        instance = await self.aget_object()
+        return Response(await self.aserialize(instance))
+
+    async def _ame(self):
+        return Response(await self.aserialize(self.request.user))
+
+    async def aserialize(self, instance, **kwargs):
+        # Serializers may evaluate lazy querysets (page slices) while building their data
+        return await sync_to_async(lambda: self.get_serializer(instance, **kwargs).data)()